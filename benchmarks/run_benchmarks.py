@@ -0,0 +1,570 @@
+import os
+import io
+import sys
+import json
+import shutil
+import time
+import argparse
+import platform
+import tempfile
+import subprocess
+import contextlib
+import tracemalloc
+import numpy as np
+
+try:
+    import resource
+except ImportError:  # Not available on Windows; peak RSS is then not reported
+    resource = None
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+# Benchmarks for the simulators, the rendering hot paths and GUI startup.
+#
+#   python benchmarks/run_benchmarks.py                  # quick tier, compared against baselines
+#   python benchmarks/run_benchmarks.py --full           # adds the 10k and 100k neuron networks
+#   python benchmarks/run_benchmarks.py --save-baseline  # record the results as this machine's baseline
+#   python benchmarks/run_benchmarks.py -k network       # only benchmarks whose name contains 'network'
+#
+# Every benchmark runs in its own process, so the peak RSS is its own. Reported
+# per benchmark: seconds per run (best of the repeats), steps/s and spikes/s
+# where they apply, peak RSS and the peak of memory allocated during one run
+# (tracemalloc). Baselines are kept per machine in baselines.json; a benchmark
+# whose time or allocations exceed its baseline by more than the tolerance
+# fails the run with exit status 1.
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baselines.json')
+
+BENCHMARKS = {}
+
+
+def benchmark(name, full_only=False):
+    # Registers a setup function; it returns a callable doing one run, which
+    # returns a dict with the 'steps' and 'spikes' it simulated (either optional)
+    # and, when only part of the run is to be timed, its own 'seconds'
+    def register(setup):
+        BENCHMARKS[name] = (setup, full_only)
+        return setup
+    return register
+
+
+def notebook_namespace(file_name, *markers):
+    # Executes the code cells of a repository notebook that contain any of the
+    # markers, with plotting sent to the Agg backend and printed output dropped
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+
+    path = os.path.join(ROOT, file_name)
+    with open(path, 'r') as file:
+        cells = json.load(file)['cells']
+    namespace = {}
+    for cell in cells:
+        source = ''.join(cell['source'])
+        if cell['cell_type'] == 'code' and any(marker in source for marker in markers):
+            with contextlib.redirect_stdout(io.StringIO()):
+                exec(compile(source, path, 'exec'), namespace)
+    plt.close('all')
+    return namespace
+
+
+# Single-neuron traces
+
+@benchmark('trace[calculate_v_and_u]')
+def trace_calculate_v_and_u():
+    from eugene_izhikevich_neuron import IzhikevichGUI
+    gui = object.__new__(IzhikevichGUI)  # Only the update rule is needed, not the window
+    a, b, c, d, I, dt = 0.02, 0.2, -65.0, 8.0, 10.0, 0.1
+    n_steps = int(1000 / dt)
+
+    def run():
+        v, u = -65.0, b * -65.0
+        spikes = 0
+        for _ in range(n_steps):
+            v, u = gui.calculate_v_and_u(v, u, I, a, b, c, d, dt)
+            spikes += v == c
+        return {'steps': n_steps, 'spikes': spikes}
+    return run
+
+
+def integrate_batch_benchmark(n_neurons):
+    from izhikevich_batch import integrate_batch
+    I = np.linspace(0, 20, n_neurons) if n_neurons > 1 else np.array([10.0])
+
+    def run():
+        t, v, spike_counts = integrate_batch(I, 0.02, 0.2, -65.0, 8.0, duration=1000, dt=0.1, record_v=False)
+        return {'steps': (len(t) - 1) * len(I), 'spikes': int(spike_counts.sum())}
+    return run
+
+
+# A batch of one shows the per-step overhead that 1000 neurons amortise
+benchmark('trace[integrate_batch]')(lambda: integrate_batch_benchmark(1000))
+benchmark('trace[integrate_batch,N=1]')(lambda: integrate_batch_benchmark(1))
+
+
+@benchmark('trace[exact_qif]')
+def trace_exact_qif():
+    from izhikevich_integrators import integrate_neuron
+
+    def run():
+        t, v, spike_times = integrate_neuron(10.0, 0.02, 0.2, -65.0, 8.0, duration=1000, dt=0.1)
+        return {'steps': len(t) - 1, 'spikes': len(spike_times)}
+    return run
+
+
+# Networks, as run by simulate_firings
+
+def network_benchmark(N, connection_probability, duration):
+    from izhikevich_simulation import IzhikevichNetwork
+    Ne = int(0.8 * N)
+    network = IzhikevichNetwork(Ne, N - Ne, seed=0, connection_probability=connection_probability)
+
+    def run():
+        network.reset()
+        firings = network.run(duration)
+        return {'steps': duration, 'spikes': len(firings)}
+    return run
+
+
+for N, connection_probability, duration, full_only in [
+        (1000, None, 1000, False),
+        (1000, 0.1, 1000, False),
+        (1000, 0.5, 1000, False),
+        (10000, 0.01, 200, True),
+        (10000, 0.1, 200, True),
+        (100000, 0.001, 50, True),
+        (100000, 0.01, 50, True)]:
+    density = 'dense' if connection_probability is None else f"p={connection_probability}"
+    benchmark(f"network[N={N},{density}]", full_only)(
+        lambda N=N, p=connection_probability, duration=duration: network_benchmark(N, p, duration))
+
+
+# Weight-matrix editor, rendered offscreen
+
+def main_window():
+    os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+    from PyQt5.QtWidgets import QApplication
+    from izhikevich_neural_network import MainWindow
+    app = QApplication.instance() or QApplication(sys.argv)
+    window = MainWindow()
+    window.auto_update = False
+    window.show()
+    while not window.initialized:  # The initial network is built in the background
+        app.processEvents()
+        time.sleep(0.001)
+    app.processEvents()
+    return app, window
+
+
+@benchmark('canvas[paintEvent]')
+def canvas_paint():
+    app, window = main_window()
+    canvas = window.canvas_widget
+
+    def run():
+        # Full recolor of the cached image followed by a synchronous repaint
+        canvas.invalidate_image()
+        canvas.repaint()
+        return {'steps': 1}
+    run.close = window.close
+    return run
+
+
+@benchmark('canvas[paintEvent,cached]')
+def canvas_paint_cached():
+    app, window = main_window()
+    canvas = window.canvas_widget
+    canvas.repaint()
+
+    def run():
+        canvas.repaint()
+        return {'steps': 1}
+    run.close = window.close
+    return run
+
+
+@benchmark('canvas[apply_brush]')
+def canvas_apply_brush():
+    app, window = main_window()
+    canvas = window.canvas_widget
+    canvas.set_brush_size(50)
+    canvas.set_brush_strength(0.01)
+    canvas_width, canvas_height, x_offset, y_offset = canvas.canvas_geometry()
+    rng = np.random.default_rng(0)
+    points = np.column_stack((x_offset + rng.integers(0, canvas_width, 100),
+                              y_offset + rng.integers(0, canvas_height, 100)))
+
+    def run():
+        for x, y in points:
+            canvas.apply_brush(int(x), int(y))
+        return {'steps': len(points)}
+    run.close = window.close
+    return run
+
+
+# GUI startup, each run in a fresh interpreter
+
+IMPORT_SCRIPT = '''
+import time
+start = time.perf_counter()
+import {module}
+print(time.perf_counter() - start)
+'''
+
+# Time from the first import to the first paint of the weight canvas, or to the
+# first raster of the initial network
+FIRST_FRAME_SCRIPT = '''
+import os, sys, time
+start = time.perf_counter()
+os.environ['QT_QPA_PLATFORM'] = 'offscreen'
+from PyQt5.QtWidgets import QApplication
+from izhikevich_neural_network import MainWindow
+app = QApplication(sys.argv)
+window = MainWindow()
+painted = []
+paint_event = window.canvas_widget.paintEvent
+def first_paint(event):
+    painted.append(time.perf_counter())
+    paint_event(event)
+window.canvas_widget.paintEvent = first_paint
+window.show()
+while not ({done}):
+    app.processEvents()
+    time.sleep(0.0005)
+print({finished} - start)
+window.close()
+'''
+
+
+# Appended to the startup scripts: the child's own peak RSS in MB, or '-'
+CHILD_PEAK_RSS_SCRIPT = '''
+import sys
+try:
+    import resource
+except ImportError:
+    print('-')
+else:
+    print(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / (2 ** 20 if sys.platform == 'darwin' else 2 ** 10))
+'''
+
+
+def startup_benchmark(script):
+    # Reports the child interpreter's time and peak RSS; measure() then skips the
+    # harness's own memory figures, which say nothing about the child
+    def run():
+        process = subprocess.run([sys.executable, '-c', script + CHILD_PEAK_RSS_SCRIPT], capture_output=True,
+                                 text=True, cwd=ROOT, check=True)
+        seconds, peak_rss = process.stdout.split()[-2:]
+        return {'seconds': float(seconds), 'peak_rss_mb': None if peak_rss == '-' else float(peak_rss)}
+    return run
+
+
+@benchmark('startup[import_neuron_gui]')
+def startup_import_neuron_gui():
+    return startup_benchmark(IMPORT_SCRIPT.format(module='eugene_izhikevich_neuron'))
+
+
+@benchmark('startup[import_network_gui]')
+def startup_import_network_gui():
+    return startup_benchmark(IMPORT_SCRIPT.format(module='izhikevich_neural_network'))
+
+
+@benchmark('startup[first_frame_network_gui]')
+def startup_first_frame():
+    return startup_benchmark(FIRST_FRAME_SCRIPT.format(done='painted', finished='painted[0]'))
+
+
+@benchmark('startup[first_raster_network_gui]')
+def startup_first_raster():
+    return startup_benchmark(FIRST_FRAME_SCRIPT.format(done='len(window.raster.firings)', finished='time.perf_counter()'))
+
+
+# Model files
+
+@benchmark('model_io[json]')
+def model_io_json():
+    from model_io import load_json_weights, save_json_weights
+    weights = np.random.default_rng(0).random((1000, 1000))
+    directory = tempfile.mkdtemp()
+    path = os.path.join(directory, 'weights.json')
+
+    def run():
+        save_json_weights(path, weights)
+        load_json_weights(path)
+        return {}
+    run.close = lambda: shutil.rmtree(directory)
+    return run
+
+
+@benchmark('model_io[npz]')
+def model_io_npz():
+    from model_io import load_model, save_model
+    weights = np.random.default_rng(0).random((1000, 1000))
+    directory = tempfile.mkdtemp()
+    path = os.path.join(directory, 'model.npz')
+
+    def run():
+        save_model(path, weights, Ne=800, Ni=200)
+        load_model(path)
+        return {}
+    run.close = lambda: shutil.rmtree(directory)
+    return run
+
+
+# Spike analysis of a million-spike raster
+
+def synthetic_firings(n_spikes=1000000, N=10000, n_steps=10000):
+    rng = np.random.default_rng(0)
+    times = np.sort(rng.integers(0, n_steps, n_spikes))
+    return np.column_stack((times, rng.integers(0, N, n_spikes))).astype(np.int32)
+
+
+@benchmark('analysis[statistics]')
+def analysis_statistics():
+    from spike_analysis import analyze, iter_chunks
+    firings = synthetic_firings()
+
+    def run():
+        statistics = analyze(iter_chunks(firings, 100000), 10000, 8000)
+        statistics.cv_isi()
+        statistics.power_spectrum(segment_ms=1000)
+        return {'spikes': len(firings)}
+    return run
+
+
+@benchmark('analysis[pyramid]')
+def analysis_pyramid():
+    from spike_analysis import RasterPyramid
+    firings = synthetic_firings()
+
+    def run():
+        pyramid = RasterPyramid(10000, bin_steps=5, neuron_bin=5)
+        pyramid.add(firings)
+        pyramid.window(0, 10000, 0, 10000, 800, 600)
+        pyramid.window(2000, 3000, 1000, 2000, 800, 600)
+        return {'spikes': len(firings)}
+    return run
+
+
+# Integrate-and-fire populations
+
+@benchmark('integrate_and_fire[N=100000]')
+def integrate_and_fire_population():
+    from integrate_and_fire import IntegrateAndFirePopulation
+    N = 100000
+    population = IntegrateAndFirePopulation(N, refractory=2.0, I=1.6 + 0.5 * np.random.default_rng(0).random(N),
+                                            dtype=np.float32)
+
+    def run():
+        population.reset()
+        firings = population.run(100, record_interval=10, record_neurons=slice(0, 100))
+        return {'steps': 100 * N, 'spikes': len(firings)}
+    return run
+
+
+# Notebook models
+
+@benchmark('notebook[hodgkin_huxley_odeint]')
+def hodgkin_huxley_odeint():
+    namespace = notebook_namespace('hodgkin-huxley.ipynb', 'import numpy', 'class HodgkinHuxleyModel', 'X0 =')
+    odeint = namespace['odeint']
+    model = namespace['HodgkinHuxleyModel']()
+    t, X0, I = namespace['t'], namespace['X0'], namespace['I']
+
+    def run():
+        V = odeint(model.dALLdt, X0, t, args=(I,))[:, 0]
+        return {'steps': len(t) - 1, 'spikes': int(np.sum((V[:-1] < 0) & (V[1:] >= 0)))}
+    return run
+
+
+@benchmark('hodgkin_huxley[N=1000]')
+def hodgkin_huxley_population():
+    from hodgkin_huxley import RateTable, integrate_hh
+    I = np.linspace(0, 30, 1000)
+    table = RateTable(0.025)
+
+    def run():
+        t, traces, spike_counts = integrate_hh(I, 100.0, 0.025, record=(), table=table)
+        return {'steps': (len(t) - 1) * len(I), 'spikes': int(spike_counts.sum())}
+    return run
+
+
+@benchmark('notebook[integrate_and_fire]')
+def integrate_and_fire():
+    namespace = notebook_namespace('fire-models.ipynb', 'import numpy', 'class IntegrateAndFireNeuron')
+    neuron_class = namespace['IntegrateAndFireNeuron']
+
+    def run():
+        v, spike_times = neuron_class().simulate(1.5, 0.1, 100)
+        return {'steps': len(v), 'spikes': len(spike_times)}
+    return run
+
+
+@benchmark('notebook[if_and_lif_loops]')
+def if_and_lif_loops():
+    ns = notebook_namespace('fire-models.ipynb', 'def leaky_integrate_and_fire')
+
+    def run():
+        V_if, spikes_if = ns['integrate_and_fire'](ns['I'], ns['dt'], ns['T'], ns['V_rest'], ns['V_reset'],
+                                                   ns['V_th'], ns['C'])
+        V_lif, spikes_lif = ns['leaky_integrate_and_fire'](ns['I'], ns['dt'], ns['T'], ns['V_rest'], ns['V_reset'],
+                                                           ns['V_th'], ns['R'], ns['tau'])
+        return {'steps': len(V_if) + len(V_lif), 'spikes': len(spikes_if) + len(spikes_lif)}
+    return run
+
+
+def peak_rss_mb():
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return peak / (2 ** 20 if sys.platform == 'darwin' else 2 ** 10)
+
+
+def measure(name, min_time=1.0, max_repeat=20):
+    setup, full_only = BENCHMARKS[name]
+    run = setup()
+    counts = run()  # Warm-up (caches, JIT compilation)
+
+    times = []
+    while not times or (sum(times) < min_time and len(times) < max_repeat):
+        start = time.perf_counter()
+        counts = run()
+        times.append(counts.get('seconds', time.perf_counter() - start))
+
+    seconds = min(times)
+    result = {'seconds': seconds, 'repeats': len(times)}
+    if 'peak_rss_mb' in counts:
+        # Ran in a child interpreter, which reported its own peak RSS
+        result['peak_rss_mb'] = counts['peak_rss_mb']
+    else:
+        tracemalloc.start()
+        run()
+        alloc_peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        result['peak_rss_mb'] = peak_rss_mb()
+        result['alloc_peak_mb'] = alloc_peak / 2 ** 20
+    if hasattr(run, 'close'):
+        run.close()
+
+    for key in ('steps', 'spikes'):
+        if key in counts:
+            result[key] = int(counts[key])
+            result[key + '_per_s'] = counts[key] / seconds
+    return result
+
+
+def run_isolated(name, min_time):
+    command = [sys.executable, os.path.abspath(__file__), '--child', name, '--min-time', str(min_time)]
+    process = subprocess.run(command, capture_output=True, text=True, cwd=ROOT)
+    if process.returncode != 0:
+        return {'error': process.stderr.strip().splitlines()[-1] if process.stderr.strip() else 'failed'}
+    return json.loads(process.stdout.strip().splitlines()[-1])
+
+
+def machine_id():
+    return f"{platform.system()}-{platform.machine()}-{os.cpu_count()}cpu-py{sys.version_info[0]}.{sys.version_info[1]}"
+
+
+def load_baselines(path):
+    if not os.path.exists(path):
+        return {}
+    with open(path, 'r') as file:
+        return json.load(file)
+
+
+def regressions(result, baseline, tolerance):
+    # Names of the metrics that got worse than baseline * (1 + tolerance)
+    worse = []
+    for key in ('seconds', 'alloc_peak_mb'):
+        if key in baseline and key in result and result[key] > baseline[key] * (1 + tolerance):
+            # Ignore allocation noise below 1 MB
+            if key == 'alloc_peak_mb' and result[key] - baseline[key] < 1.0:
+                continue
+            worse.append(key)
+    return worse
+
+
+def format_value(value, unit=''):
+    if value is None:
+        return '-'
+    for scale, prefix in ((1e9, 'G'), (1e6, 'M'), (1e3, 'k')):
+        if abs(value) >= scale:
+            return f"{value / scale:.2f}{prefix}{unit}"
+    return f"{value:.3g}{unit}"
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the simulators and rendering paths.")
+    parser.add_argument('-k', '--filter', default='', help="only run benchmarks whose name contains this")
+    parser.add_argument('--full', action='store_true', help="include the 10k and 100k neuron networks")
+    parser.add_argument('--min-time', type=float, default=1.0, help="minimum total timed seconds per benchmark")
+    parser.add_argument('--baseline', default=BASELINE_PATH, help="baseline file")
+    parser.add_argument('--save-baseline', action='store_true', help="store the results as this machine's baseline")
+    parser.add_argument('--tolerance', type=float, default=0.25, help="allowed relative slowdown before failing")
+    parser.add_argument('--machine', default=None, help="baseline key (defaults to a description of this machine)")
+    parser.add_argument('--output', default=None, help="also write the results to this JSON file")
+    parser.add_argument('--list', action='store_true', help="list the benchmarks and exit")
+    parser.add_argument('--child', default=None, help=argparse.SUPPRESS)
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+
+    if args.child is not None:
+        print(json.dumps(measure(args.child, args.min_time)))
+        return 0
+
+    names = [name for name, (setup, full_only) in BENCHMARKS.items()
+             if args.filter in name and (args.full or not full_only)]
+    if args.list:
+        print('\n'.join(names))
+        return 0
+
+    machine = args.machine or machine_id()
+    baselines = load_baselines(args.baseline)
+    machine_baseline = baselines.get(machine, {})
+
+    results = {}
+    failed = False
+    print(f"{'benchmark':36} {'time':>10} {'steps/s':>10} {'spikes/s':>10} {'peak RSS':>10} {'allocated':>10}  status")
+    for name in names:
+        result = run_isolated(name, args.min_time)
+        results[name] = result
+        if 'error' in result:
+            failed = True
+            print(f"{name:36} {'':54}  error: {result['error']}")
+            continue
+
+        status = 'no baseline'
+        if name in machine_baseline:
+            baseline = machine_baseline[name]
+            worse = regressions(result, baseline, args.tolerance)
+            change = result['seconds'] / baseline['seconds'] - 1
+            status = f"{change:+.0%} vs baseline"
+            if worse:
+                failed = True
+                status += ', REGRESSION (' + ', '.join(worse) + ')'
+        print(f"{name:36} {format_value(result['seconds'], 's'):>10} {format_value(result.get('steps_per_s')):>10} "
+              f"{format_value(result.get('spikes_per_s')):>10} {format_value(result['peak_rss_mb'], 'MB'):>10} "
+              f"{format_value(result.get('alloc_peak_mb'), 'MB'):>10}  {status}")
+
+    if args.output:
+        with open(args.output, 'w') as file:
+            json.dump({'machine': machine, 'results': results}, file, indent=2)
+
+    if args.save_baseline:
+        machine_baseline.update({name: result for name, result in results.items() if 'error' not in result})
+        baselines[machine] = machine_baseline
+        with open(args.baseline, 'w') as file:
+            json.dump(baselines, file, indent=2, sort_keys=True)
+        print(f"Saved baseline for {machine} to {args.baseline}")
+        return 0
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,10 +1,9 @@
 import tkinter as tk
 from tkinter import ttk
+import numpy as np
 from matplotlib.figure import Figure
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
-import numpy as np
-import matplotlib.pyplot as plt
-import mplcursors
+from izhikevich_integrators import METHODS, integrate_neuron
 
 class IzhikevichGUI:
     def __init__(self, root):
@@ -51,6 +50,23 @@ class IzhikevichGUI:
         self.reset_button = ttk.Button(self.button_frame, text="Reset", command=self.reset_sliders)
         self.reset_button.pack(side=tk.LEFT, padx=5)
 
+        # Integrator choice; the non-Euler methods stay accurate at much coarser steps
+        ttk.Label(self.button_frame, text="Integrator").pack(side=tk.LEFT, padx=5)
+        self.integrator_var = tk.StringVar(value='euler')
+        integrator_box = ttk.Combobox(self.button_frame, textvariable=self.integrator_var, values=METHODS,
+                                      state='readonly', width=10)
+        integrator_box.pack(side=tk.LEFT, padx=5)
+        integrator_box.bind("<<ComboboxSelected>>", lambda event: self.plot_graph())
+
+        ttk.Label(self.button_frame, text="dt (ms)").pack(side=tk.LEFT, padx=5)
+        self.dt_var = tk.StringVar(value='0.1')
+        self.last_dt = 0.1
+        dt_box = ttk.Combobox(self.button_frame, textvariable=self.dt_var,
+                              values=('0.1', '0.25', '0.5', '1.0'), width=5)
+        dt_box.pack(side=tk.LEFT, padx=5)
+        dt_box.bind("<<ComboboxSelected>>", lambda event: self.plot_graph())
+        dt_box.bind("<Return>", lambda event: self.plot_graph())
+
         self.create_preset_buttons()
 
         self.figure = Figure(figsize=(6, 4), dpi=100)
@@ -60,8 +76,24 @@ class IzhikevichGUI:
         
         self.canvas.mpl_connect('scroll_event', self.on_scroll)
         
-        # Initial plot
+        # Artists are created once and updated in place by plot_graph
+        self.voltage_line, = self.ax.plot([], [], label='v (mV)')
+        self.step_line = self.ax.axvline(0, color='r', linestyle='--', label='Voltage step change')
+        self.ax.set_title('Neuron Voltage over Time')
+        self.ax.set_xlabel('Time (ms)')
+        self.ax.set_ylabel('Voltage (mV)')
+
+        # The first trace and the hover cursor are added once the window is up,
+        # so startup does not wait for the simulation or mplcursors
+        self.root.after_idle(self.finish_startup)
+
+    def finish_startup(self):
         self.plot_graph()
+        try:
+            import mplcursors
+        except ImportError:  # The hover cursor is optional
+            return
+        mplcursors.cursor(self.voltage_line)  # Add interactive cursor once
         
     def create_slider(self, label_text, min_val, max_val, step, initial_value):
         frame = ttk.Frame(self.sliders_frame)
@@ -135,47 +167,55 @@ class IzhikevichGUI:
         c = self.c_slider.get()
         d = self.d_slider.get()
         
-        if self.current_neuron_type == 'TC':
-            t = np.linspace(0, 200, 2000)  # Double the time steps for TC neurons
-            dt = t[1] - t[0]  # Time step
-            half_step = len(t) // 2
-            I_values = np.ones(len(t)) * I
+        method = self.integrator_var.get()
+        dt = self.get_dt()
+        is_tc = self.current_neuron_type == 'TC'
+        duration = 200 if is_tc else 100  # Double the time for TC neurons
+        n_steps = int(round(duration / dt))
+        
+        if method == 'euler':
+            # One neuron: the scalar loop is far cheaper than integrate_batch on 1-element arrays
+            t = np.linspace(0, duration, n_steps)
+            half_step = n_steps // 2 if is_tc else None  # Step the voltage halfway through TC traces
             v_values = [v]
-            u = b * v  # Initial value of u
-            
-            for i in range(1, half_step):
-                v, u = self.calculate_v_and_u(v, u, I_values[i], a, b, c, d, dt)
-                v_values.append(v)
-            
-            v = -95  # Reset voltage for the second half
-            u = b * v  # Reset recovery variable u
-            for i in range(half_step, len(t)):
-                v, u = self.calculate_v_and_u(v, u, I_values[i], a, b, c, d, dt)
+            u = b * v
+            for i in range(1, n_steps):
+                if i == half_step:
+                    v = -95
+                    u = b * v
+                v, u = self.calculate_v_and_u(v, u, I, a, b, c, d, t[1] - t[0])
                 v_values.append(v)
+            if is_tc:
+                step_time = t[half_step]
         else:
-            t = np.linspace(0, 100, 1000)
-            dt = t[1] - t[0]  # Time step
-            I_values = np.ones(len(t)) * I
-            v_values = [v]
-            u = b * v  # Initial value of u
-            
-            for i in range(1, len(t)):
-                v, u = self.calculate_v_and_u(v, u, I_values[i], a, b, c, d, dt)
-                v_values.append(v)
+            step_time = duration / 2
+            t, v_values, _ = integrate_neuron(I, a, b, c, d, v0=v, duration=duration, dt=dt, method=method,
+                                              voltage_step=(step_time, -95) if is_tc else None)
         
-        self.ax.clear()
-        self.ax.plot(t, v_values, label='v (mV)')
+        self.voltage_line.set_data(t, v_values)
         
-        if self.current_neuron_type == 'TC':
-            self.ax.axvline(t[half_step], color='r', linestyle='--', label='Voltage step change')
+        if is_tc:
+            self.step_line.set_xdata([step_time, step_time])
+        self.step_line.set_visible(is_tc)
+        self.step_line.set_label('Voltage step change' if is_tc else '_nolegend_')
         
-        self.ax.set_title('Neuron Voltage over Time')
-        self.ax.set_xlabel('Time (ms)')
-        self.ax.set_ylabel('Voltage (mV)')
+        self.ax.relim(visible_only=True)
+        self.ax.autoscale_view()
         self.ax.legend()
-        self.canvas.draw()
-        mplcursors.cursor(self.ax)  # Add interactive cursor
+        self.canvas.draw_idle()
         
+    def get_dt(self):
+        # The dt box is editable: anything but a step in (0, 10] ms restores the last valid dt
+        try:
+            dt = float(self.dt_var.get())
+        except ValueError:
+            dt = None
+        if dt is None or not 0 < dt <= 10:
+            self.dt_var.set(f"{self.last_dt:g}")
+            return self.last_dt
+        self.last_dt = dt
+        return dt
+
     def on_scroll(self, event):
         if event.button == 'up':
             self.ax.set_xlim(self.ax.get_xlim()[0] * 1.1, self.ax.get_xlim()[1] * 1.1)
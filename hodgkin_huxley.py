@@ -0,0 +1,248 @@
+import sys
+import time
+import numpy as np
+
+# Hodgkin-Huxley populations integrated as arrays. Every argument of
+# integrate_hh broadcasts to one batch shape, e.g. (neurons, currents) for an
+# F-I sweep over heterogeneous cells.
+#
+#   rush_larsen  the gates and V follow the exact exponential solution of their
+#                linear ODEs with the coefficients frozen over the step; the rates
+#                come from a precomputed voltage lookup table (default)
+#   rk4          classic Runge-Kutta on the full system with the rate functions
+#                evaluated directly, as a reference
+
+DEFAULT_PARAMS = {
+    'gNa': 120.0,     # Sodium conductance in mS/cm^2
+    'gK': 36.0,       # Potassium conductance in mS/cm^2
+    'gL': 0.3,        # Leak conductance in mS/cm^2
+    'Cm': 1.0,        # Membrane capacitance in µF/cm^2
+    'ENa': 50.0,      # Sodium reversal potential in mV
+    'EK': -77.0,      # Potassium reversal potential in mV
+    'EL': -54.387,    # Leak reversal potential in mV
+}
+
+# Initial gates used in hodgkin-huxley.ipynb
+DEFAULT_GATES = {'m': 0.05, 'h': 0.6, 'n': 0.32}
+
+METHODS = ('rush_larsen', 'rk4')
+
+
+def _vtrap(x, y):
+    # x / (1 - exp(-x / y)) with the removable singularity at x = 0 filled in
+    x = np.asarray(x, dtype=np.float64)
+    small = np.abs(x / y) < 1e-6
+    safe = np.where(small, 1.0, x)
+    return np.where(small, y * (1 + x / (2 * y)), safe / -np.expm1(-safe / y))
+
+
+def alpha_m(V):
+    return 0.1 * _vtrap(V + 40.0, 10.0)
+
+
+def beta_m(V):
+    return 4.0 * np.exp(-(V + 65.0) / 18.0)
+
+
+def alpha_h(V):
+    return 0.07 * np.exp(-(V + 65.0) / 20.0)
+
+
+def beta_h(V):
+    return 1.0 / (1.0 + np.exp(-(V + 35.0) / 10.0))
+
+
+def alpha_n(V):
+    return 0.01 * _vtrap(V + 55.0, 10.0)
+
+
+def beta_n(V):
+    return 0.125 * np.exp(-(V + 65) / 80.0)
+
+
+RATES = {'m': (alpha_m, beta_m), 'h': (alpha_h, beta_h), 'n': (alpha_n, beta_n)}
+
+
+def steady_state(V):
+    # (m, h, n) at rest for a holding potential V
+    return tuple(alpha(V) / (alpha(V) + beta(V)) for alpha, beta in RATES.values())
+
+
+def ionic_currents(V, m, h, n, params=None):
+    # (I_Na, I_K, I_L) for whole arrays of states, e.g. a recorded trace
+    p = dict(DEFAULT_PARAMS, **(params or {}))
+    return (p['gNa'] * m ** 3 * h * (V - p['ENa']),
+            p['gK'] * n ** 4 * (V - p['EK']),
+            p['gL'] * (V - p['EL']))
+
+
+def derivatives(V, m, h, n, I, params=None):
+    # Right-hand side of the full system, elementwise over the batch
+    p = dict(DEFAULT_PARAMS, **(params or {}))
+    I_Na, I_K, I_L = ionic_currents(V, m, h, n, p)
+    return ((I - I_Na - I_K - I_L) / p['Cm'],
+            alpha_m(V) * (1.0 - m) - beta_m(V) * m,
+            alpha_h(V) * (1.0 - h) - beta_h(V) * h,
+            alpha_n(V) * (1.0 - n) - beta_n(V) * n)
+
+
+class RateTable:
+    # Rush-Larsen coefficients of the three gates for a fixed dt, tabulated over
+    # v_min..v_max in steps of `resolution` mV. Each row holds (m_inf, m_decay,
+    # h_inf, h_decay, n_inf, n_decay), where a gate advances as
+    # x <- x_inf + (x - x_inf) * decay. Lookups take the nearest row, which at the
+    # default 0.01 mV is well below the integration error and about four times
+    # faster than interpolating; interpolate=True interpolates linearly instead.
+    # Voltages outside the range are clamped.
+    def __init__(self, dt, v_min=-150.0, v_max=100.0, resolution=0.01, interpolate=False):
+        self.dt = dt
+        self.v_min = v_min
+        self.resolution = resolution
+        self.interpolate = interpolate
+        self.size = int(round((v_max - v_min) / resolution)) + 1
+        self.v_max = v_min + (self.size - 1) * resolution
+
+        V = v_min + resolution * np.arange(self.size)
+        columns = []
+        for alpha, beta in RATES.values():
+            a, b = alpha(V), beta(V)
+            columns.append(a / (a + b))
+            columns.append(np.exp(-dt * (a + b)))
+        self.values = np.column_stack(columns)
+        # Slopes per table interval, so an interpolated lookup is one gather plus a multiply-add
+        self.slopes = np.vstack((np.diff(self.values, axis=0), np.zeros((1, 6))))
+        self._rows = np.hstack((self.values, self.slopes))
+
+    def lookup(self, V, out=None):
+        position = np.minimum(np.maximum(V, self.v_min), self.v_max)
+        position -= self.v_min
+        position *= 1 / self.resolution
+        if out is None:
+            out = np.empty(np.shape(V) + (6,))
+        if not self.interpolate:
+            position += 0.5
+            np.take(self.values, position.astype(np.intp), axis=0, out=out)
+            return out
+
+        index = position.astype(np.intp)
+        position -= index
+        rows = np.take(self._rows, index, axis=0)
+        np.multiply(rows[..., 6:], position[..., np.newaxis], out=out)
+        out += rows[..., :6]
+        return out
+
+
+def _rush_larsen_step(V, m, h, n, I, p, dt, table, rates):
+    # Gates first, from the current V, then V from the updated gates. Staggering
+    # the two halves this way keeps spike times within a few dt of the reference
+    # even at dt = 0.1 ms, where updating both from the old state drifts badly.
+    table.lookup(V, out=rates)
+    for x, column in ((m, 0), (h, 2), (n, 4)):
+        x_inf = rates[..., column]
+        x -= x_inf
+        x *= rates[..., column + 1]
+        x += x_inf
+
+    # With the gates frozen, V relaxes exponentially to the reversal potential
+    # weighted by the conductances
+    gNa = p['gNa'] * m ** 3 * h
+    gK = p['gK'] * n ** 4
+    g_total = gNa + gK + p['gL']
+    V_inf = (I + gNa * p['ENa'] + gK * p['EK'] + p['gL'] * p['EL']) / g_total
+    V -= V_inf
+    V *= np.exp(-dt / p['Cm'] * g_total)
+    V += V_inf
+
+
+def _rk4_step(V, m, h, n, I, p, dt):
+    state = (V, m, h, n)
+    k1 = derivatives(*state, I, p)
+    k2 = derivatives(*[x + 0.5 * dt * k for x, k in zip(state, k1)], I, p)
+    k3 = derivatives(*[x + 0.5 * dt * k for x, k in zip(state, k2)], I, p)
+    k4 = derivatives(*[x + dt * k for x, k in zip(state, k3)], I, p)
+    for x, a, b, c, d in zip(state, k1, k2, k3, k4):
+        x += dt / 6 * (a + 2 * b + 2 * c + d)
+
+
+def integrate_hh(I, duration=50.0, dt=0.01, v0=-65.0, m0=None, h0=None, n0=None, method='rush_larsen',
+                 record=('V',), record_interval=1, spike_threshold=0.0, table=None, **params):
+    # Returns (t, traces, spike_counts). I, v0, the initial gates and any of the
+    # DEFAULT_PARAMS passed as keywords broadcast to the batch shape. traces maps
+    # each name in `record` ('V', 'm', 'h', 'n') to a (samples, *shape) array taken
+    # every record_interval steps; spikes are upward crossings of spike_threshold.
+    # A RateTable built for this dt can be passed in to reuse it across calls.
+    if method not in METHODS:
+        raise ValueError(f"Unknown method {method!r}, expected one of {METHODS}")
+    p = dict(DEFAULT_PARAMS, **params)
+    m0 = DEFAULT_GATES['m'] if m0 is None else m0
+    h0 = DEFAULT_GATES['h'] if h0 is None else h0
+    n0 = DEFAULT_GATES['n'] if n0 is None else n0
+
+    values = [np.asarray(x, dtype=np.float64) for x in [I, v0, m0, h0, n0] + [p[name] for name in DEFAULT_PARAMS]]
+    shape = np.broadcast_shapes(*[x.shape for x in values])
+    I = np.broadcast_to(values[0], shape)
+    V, m, h, n = [np.array(np.broadcast_to(x, shape)) for x in values[1:5]]
+    p = dict(zip(DEFAULT_PARAMS, values[5:]))
+
+    if method == 'rush_larsen':
+        if table is None or table.dt != dt:
+            table = RateTable(dt)
+        rates = np.empty(shape + (6,))
+
+    n_steps = int(round(duration / dt))
+    n_samples = n_steps // record_interval + 1
+    t = np.arange(n_samples) * (dt * record_interval)
+    state = {'V': V, 'm': m, 'h': h, 'n': n}
+    traces = {name: np.empty((n_samples,) + shape) for name in record}
+    for name in record:
+        traces[name][0] = state[name]
+
+    spike_counts = np.zeros(shape, dtype=np.int64)
+    below = np.array(V < spike_threshold)
+    above = np.empty(shape, dtype=bool)
+    for i in range(1, n_steps + 1):
+        if method == 'rush_larsen':
+            _rush_larsen_step(V, m, h, n, I, p, dt, table, rates)
+        else:
+            _rk4_step(V, m, h, n, I, p, dt)
+
+        np.greater_equal(V, spike_threshold, out=above)
+        below &= above  # Upward crossings
+        spike_counts += below
+        np.logical_not(above, out=below)
+
+        if i % record_interval == 0:
+            for name in record:
+                traces[name][i // record_interval] = state[name]
+
+    return t, traces, spike_counts
+
+
+def fi_curve(I_values, duration=1000.0, dt=0.025, transient=100.0, method='rush_larsen', **kwargs):
+    # Firing rate (Hz) after the first `transient` ms for every current; extra
+    # keywords go to integrate_hh and broadcast with I_values (e.g. gNa=gNa[:, np.newaxis])
+    table = RateTable(dt) if method == 'rush_larsen' else None
+    n_transient = int(round(transient / dt))
+    _, state, _ = integrate_hh(I_values, transient, dt, method=method, record=('V', 'm', 'h', 'n'),
+                               record_interval=max(1, n_transient), table=table, **kwargs)
+
+    params = {name: value for name, value in kwargs.items() if name not in ('v0', 'm0', 'h0', 'n0')}
+    _, _, spike_counts = integrate_hh(I_values, duration - transient, dt, state['V'][-1], state['m'][-1],
+                                      state['h'][-1], state['n'][-1], method=method, record=(), table=table,
+                                      **params)
+    return spike_counts / ((duration - transient) / 1000.0)
+
+
+if __name__ == "__main__":
+    # Population F-I sweep: neurons with scattered sodium conductance x currents
+    n_neurons = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+    rng = np.random.default_rng(0)
+    I_values = np.linspace(0, 30, 31)
+    gNa = 120.0 * (1 + 0.1 * rng.standard_normal((n_neurons, 1)))
+
+    start = time.perf_counter()
+    rates = fi_curve(I_values, duration=1000.0, dt=0.025, gNa=gNa)
+    elapsed = time.perf_counter() - start
+    print(f"{rates.size} neurons x 1000 ms in {elapsed:.2f} s")
+    for I, rate in zip(I_values[::5], rates.mean(axis=0)[::5]):
+        print(f"I = {I:5.1f} uA/cm^2: {rate:6.1f} Hz")
@@ -0,0 +1,282 @@
+import json
+import numpy as np
+
+# Input currents for the network models. A drive is called as drive(t, rng)
+# with the step index and the network's np.random.Generator and returns the
+# input of every neuron for that step, like any input_generator. The returned
+# array belongs to the caller, which may add synaptic input to it in place.
+#
+# Random drives draw block_steps steps of numbers at once. When a drive is the
+# only consumer of its generator (as with the default thalamic noise), the values
+# equal those of drawing one step at a time, so block_steps does not change the
+# raster; summed random drives interleave whole blocks, so there block_steps is
+# part of the seed. Drives can be summed with `+`, and partition(lo, hi) gives
+# the drive of neurons lo..hi-1, which ParallelIzhikevichNetwork calls once per
+# worker so each worker draws its own noise. get_state() returns the arrays a
+# drive needs to continue exactly where it was (see simulation_checkpoint).
+
+
+def population_scale(sizes, scales):
+    # population_scale((Ne, Ni), (5.0, 2.0)) -> per-neuron scale array
+    return np.repeat(np.asarray(scales, dtype=np.float64), sizes)
+
+
+class Drive:
+    def __init__(self, N, dt=1.0):
+        self.N = N
+        self.dt = dt
+
+    def __call__(self, t, rng):
+        raise NotImplementedError
+
+    def __add__(self, other):
+        return SummedDrive(self, other)
+
+    def reset(self):
+        pass
+
+    def get_state(self):
+        return {}
+
+    def set_state(self, state):
+        pass
+
+    def partition(self, lo, hi):
+        raise NotImplementedError(f"{type(self).__name__} cannot be partitioned")
+
+    @staticmethod
+    def _slice(values, lo, hi):
+        values = np.asarray(values)
+        return values if values.ndim == 0 else values[lo:hi]
+
+
+class SummedDrive(Drive):
+    def __init__(self, *drives):
+        super().__init__(drives[0].N, drives[0].dt)
+        self.drives = []
+        for drive in drives:
+            self.drives.extend(drive.drives if isinstance(drive, SummedDrive) else [drive])
+
+    def __call__(self, t, rng):
+        I = self.drives[0](t, rng)
+        for drive in self.drives[1:]:
+            I += drive(t, rng)
+        return I
+
+    def reset(self):
+        for drive in self.drives:
+            drive.reset()
+
+    def get_state(self):
+        return {f"{i}/{name}": value for i, drive in enumerate(self.drives)
+                for name, value in drive.get_state().items()}
+
+    def set_state(self, state):
+        for i, drive in enumerate(self.drives):
+            prefix = f"{i}/"
+            drive.set_state({name[len(prefix):]: value for name, value in state.items() if name.startswith(prefix)})
+
+    def partition(self, lo, hi):
+        return SummedDrive(*[drive.partition(lo, hi) for drive in self.drives])
+
+
+class _BlockDrive(Drive):
+    # Buffers block_steps rows of random numbers and hands them out one step at a time
+    def __init__(self, N, dt=1.0, block_steps=100):
+        super().__init__(N, dt)
+        self.block_steps = block_steps
+        # Buffered rows survive reset(), so resetting a network does not skip numbers
+        self._block = None
+        self._row = 0
+        self.reset()
+
+    def _draw(self, rng, shape):
+        raise NotImplementedError
+
+    def _next_row(self, rng):
+        if self._block is None or self._row == len(self._block):
+            self._block_rng = rng.bit_generator.state
+            self._block = self._draw(rng, (self.block_steps, self.N))
+            self._row = 0
+        row = self._block[self._row]
+        self._row += 1
+        return row
+
+    def get_state(self):
+        # The generator state the current block was drawn from, instead of the
+        # block itself, which set_state draws again
+        if self._block is None:
+            return {}
+        return {'block_rng': np.array(json.dumps(self._block_rng)), 'row': np.array(self._row)}
+
+    def set_state(self, state):
+        self._block = None
+        self._row = 0
+        if 'block_rng' in state:
+            self._block_rng = json.loads(str(state['block_rng']))
+            bit_generator = getattr(np.random, self._block_rng['bit_generator'])()
+            bit_generator.state = self._block_rng
+            self._block = self._draw(np.random.Generator(bit_generator), (self.block_steps, self.N))
+            self._row = int(state['row'])
+
+
+class ThalamicNoise(_BlockDrive):
+    # White-noise current of standard deviation scale / sqrt(dt), so that its
+    # effect on v does not depend on the step; scale is a scalar or one value per
+    # neuron (see population_scale). The default network input is
+    # ThalamicNoise(population_scale((Ne, Ni), (5.0, 2.0)), dt=dt).
+    def __init__(self, scale, N=None, dt=1.0, block_steps=100):
+        self.scale = np.asarray(scale, dtype=np.float64)
+        self.std = self.scale / np.sqrt(dt)
+        super().__init__(len(self.scale) if N is None else N, dt, block_steps)
+
+    def _draw(self, rng, shape):
+        block = rng.standard_normal(shape)
+        block *= self.std
+        return block
+
+    def __call__(self, t, rng):
+        # Rows of a block are used once, so the row itself can be handed out
+        return self._next_row(rng)
+
+    def partition(self, lo, hi):
+        return ThalamicNoise(self._slice(self.scale, lo, hi), hi - lo, self.dt, self.block_steps)
+
+
+class PoissonInput(_BlockDrive):
+    # Every neuron receives n_inputs independent Poisson spike trains of rate_hz;
+    # each input spike kicks v by `weight` mV, i.e. adds weight / dt to that
+    # step's current
+    def __init__(self, N, rate_hz, weight=1.0, n_inputs=1, dt=1.0, block_steps=100):
+        self.rate_hz = np.asarray(rate_hz, dtype=np.float64)
+        self.weight = np.asarray(weight, dtype=np.float64)
+        self.n_inputs = np.asarray(n_inputs)
+        self.expected = self.rate_hz * self.n_inputs * dt / 1000.0  # Input spikes per step
+        self.kick = self.weight / dt
+        super().__init__(N, dt, block_steps)
+
+    def _draw(self, rng, shape):
+        return rng.poisson(np.broadcast_to(self.expected, shape[1:]), shape)
+
+    def __call__(self, t, rng):
+        return self.kick * self._next_row(rng)
+
+    def partition(self, lo, hi):
+        return PoissonInput(hi - lo, self._slice(self.rate_hz, lo, hi), self._slice(self.weight, lo, hi),
+                            self._slice(self.n_inputs, lo, hi), self.dt, self.block_steps)
+
+
+class OUInput(_BlockDrive):
+    # Ornstein-Uhlenbeck current relaxing to `mean` with time constant tau (ms)
+    # and stationary standard deviation sigma, advanced with its exact update
+    def __init__(self, N, mean=0.0, sigma=1.0, tau=10.0, dt=1.0, block_steps=100, initial=None):
+        self.mean = np.asarray(mean, dtype=np.float64)
+        self.sigma = np.asarray(sigma, dtype=np.float64)
+        self.tau = np.asarray(tau, dtype=np.float64)
+        self.initial = initial
+        self.decay = np.exp(-dt / self.tau)
+        self.kick = self.sigma * np.sqrt(1 - self.decay ** 2)
+        super().__init__(N, dt, block_steps)
+
+    def reset(self):
+        initial = self.mean if self.initial is None else self.initial
+        self.current = np.array(np.broadcast_to(np.asarray(initial, dtype=np.float64), (self.N,)))
+
+    def _draw(self, rng, shape):
+        block = rng.standard_normal(shape)
+        block *= self.kick
+        return block
+
+    def get_state(self):
+        return dict(super().get_state(), current=self.current.copy())
+
+    def set_state(self, state):
+        super().set_state(state)
+        self.current = np.array(state['current'], dtype=np.float64)
+
+    def __call__(self, t, rng):
+        self.current -= self.mean
+        self.current *= self.decay
+        self.current += self.mean
+        self.current += self._next_row(rng)
+        return self.current.copy()
+
+    def partition(self, lo, hi):
+        initial = None if self.initial is None else self._slice(np.broadcast_to(self.initial, (self.N,)), lo, hi)
+        return OUInput(hi - lo, self._slice(self.mean, lo, hi), self._slice(self.sigma, lo, hi),
+                       self._slice(self.tau, lo, hi), self.dt, self.block_steps, initial)
+
+
+class StepCurrent(Drive):
+    # `amplitude` (scalar or per neuron) from start to stop ms, 0 otherwise
+    def __init__(self, N, amplitude, start=0.0, stop=None, dt=1.0):
+        super().__init__(N, dt)
+        self.amplitude = np.asarray(amplitude, dtype=np.float64)
+        self.start = start
+        self.stop = stop
+
+    def __call__(self, t, rng):
+        time = t * self.dt
+        if time < self.start or (self.stop is not None and time >= self.stop):
+            return np.zeros(self.N)
+        return np.array(np.broadcast_to(self.amplitude, (self.N,)))
+
+    def partition(self, lo, hi):
+        return StepCurrent(hi - lo, self._slice(self.amplitude, lo, hi), self.start, self.stop, self.dt)
+
+
+class RampCurrent(Drive):
+    # Linear ramp from `initial` at start ms to `final` at stop ms, holding the
+    # end values outside that window
+    def __init__(self, N, initial, final, start, stop, dt=1.0):
+        super().__init__(N, dt)
+        self.initial = np.asarray(initial, dtype=np.float64)
+        self.final = np.asarray(final, dtype=np.float64)
+        self.start = start
+        self.stop = stop
+
+    def __call__(self, t, rng):
+        fraction = min(max((t * self.dt - self.start) / (self.stop - self.start), 0.0), 1.0)
+        return np.array(np.broadcast_to(self.initial + fraction * (self.final - self.initial), (self.N,)))
+
+    def partition(self, lo, hi):
+        return RampCurrent(hi - lo, self._slice(self.initial, lo, hi), self._slice(self.final, lo, hi),
+                           self.start, self.stop, self.dt)
+
+
+class ReplayedCurrent(Drive):
+    # Replays a recorded (steps, N) current array, or a .npy file holding one,
+    # which is memory-mapped so long recordings are read step by step. Past the
+    # end the input is zero, or the recording repeats with loop=True.
+    def __init__(self, currents, dt=1.0, loop=False, columns=slice(None)):
+        if not isinstance(currents, np.ndarray):
+            currents = np.load(currents, mmap_mode='r')
+        self.currents = currents
+        self.columns = columns
+        self.loop = loop
+        super().__init__(len(np.arange(currents.shape[1])[columns]), dt)
+
+    def __call__(self, t, rng):
+        if self.loop:
+            t %= len(self.currents)
+        elif t >= len(self.currents):
+            return np.zeros(self.N)
+        return np.array(self.currents[t, self.columns], dtype=np.float64)
+
+    def partition(self, lo, hi):
+        columns = np.arange(self.currents.shape[1])[self.columns][lo:hi]
+        if len(columns) and np.all(np.diff(columns) == 1):
+            columns = slice(columns[0], columns[-1] + 1)
+        return ReplayedCurrent(self.currents, self.dt, self.loop, columns)
+
+
+def record_drive(drive, n_steps, seed=None, path=None):
+    # Evaluates a drive for n_steps and returns the (n_steps, N) currents, saved to
+    # `path` as .npy if given, so a random input can be replayed exactly
+    rng = np.random.default_rng(seed)
+    currents = np.empty((n_steps, drive.N))
+    for t in range(n_steps):
+        currents[t] = drive(t, rng)
+    if path is not None:
+        np.save(path, currents)
+    return currents
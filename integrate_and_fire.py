@@ -0,0 +1,148 @@
+import sys
+import time
+import numpy as np
+from spike_recorder import SpikeRecorder
+
+# Integrate-and-fire populations advanced as arrays.
+#
+#   leaky=True   tau dV/dt = -(V - V_rest) + R I
+#                solved exactly over each step for the step's input, so any dt is stable
+#   leaky=False  C dV/dt = I   (perfect integrator, also exact)
+#
+# V >= V_th emits a spike and resets V to V_reset, where it is held for
+# `refractory` ms. Defaults are the leaky integrate-and-fire values of
+# fire-models.ipynb; every parameter may be a scalar or a per-neuron array.
+
+
+class IntegrateAndFirePopulation:
+    def __init__(self, N, V_rest=-70.0, V_reset=-65.0, V_th=-55.0, R=10.0, tau=10.0, C=1.0, refractory=0.0,
+                 leaky=True, dt=1.0, I=0.0, seed=None, dtype=np.float64):
+        # I is a constant input (scalar or per-neuron array) or a callable
+        # I(t, rng) -> array called every step with the step index, like the
+        # input_generator of IzhikevichNetwork
+        self.N = N
+        self.dt = dt
+        self.leaky = leaky
+        self.seed = seed
+        self.rng = np.random.default_rng(seed)
+        self.dtype = np.dtype(dtype)
+
+        def parameter(values):
+            values = np.asarray(values, dtype=self.dtype)
+            return values if values.ndim == 0 else np.ascontiguousarray(np.broadcast_to(values, (N,)))
+
+        self.V_rest = parameter(V_rest)
+        self.V_reset = parameter(V_reset)
+        self.V_th = parameter(V_th)
+        self.R = parameter(R)
+        self.tau = parameter(tau)
+        self.C = parameter(C)
+        if leaky:
+            # Fraction of the distance to the steady state V_rest + R I left after one step
+            self.decay = parameter(np.exp(-dt / np.asarray(tau, dtype=np.float64)))
+        else:
+            self.gain = parameter(dt / np.asarray(C, dtype=np.float64))
+
+        self.refractory_steps = np.broadcast_to(np.round(np.asarray(refractory) / dt).astype(np.int32), (N,))
+        self.has_refractory = bool(self.refractory_steps.any())
+
+        self.input_generator = I if callable(I) else None
+        self.I = None if callable(I) else parameter(I)
+
+        self.reset()
+
+    def reset(self, v0=None):
+        if v0 is None:
+            v0 = self.V_rest
+        self.v = np.array(np.broadcast_to(np.asarray(v0, dtype=self.dtype), (self.N,)))
+        self.refractory_left = np.zeros(self.N, dtype=np.int32)
+        self._target = np.empty(self.N, dtype=self.dtype)
+        self._above = np.empty(self.N, dtype=bool)
+        self.t = 0
+        if hasattr(self.input_generator, 'reset'):
+            self.input_generator.reset()
+
+    def step(self):
+        I = self.I if self.input_generator is None else self.input_generator(self.t, self.rng)
+        v = self.v
+        if self.leaky:
+            # V <- V_inf + (V - V_inf) exp(-dt / tau) with V_inf = V_rest + R I
+            target = self._target
+            np.multiply(self.R, I, out=target)
+            target += self.V_rest
+            v -= target
+            v *= self.decay
+            v += target
+        else:
+            v += self.gain * I
+
+        if self.has_refractory:
+            held = self.refractory_left > 0
+            np.copyto(v, self.V_reset, where=held)
+            np.subtract(self.refractory_left, 1, out=self.refractory_left, where=held)
+
+        np.greater_equal(v, self.V_th, out=self._above)
+        fired = np.flatnonzero(self._above)
+        if len(fired):
+            v[fired] = self.V_reset if self.V_reset.ndim == 0 else self.V_reset[fired]
+            if self.has_refractory:
+                self.refractory_left[fired] = self.refractory_steps[fired]
+        self.t += 1
+        return fired
+
+    def run(self, duration, recorder=None, record_interval=None, record_neurons=None):
+        # Returns an int32 (n_spikes, 2) array of [time step, neuron index] rows.
+        # With record_interval (in steps) the voltages of record_neurons (default
+        # all) after every record_interval-th step are kept in self.voltages, a
+        # preallocated (samples, neurons) array, with their times in ms in
+        # self.sample_times.
+        if recorder is None:
+            recorder = SpikeRecorder(self.N, dt=self.dt)
+        self.recorder = recorder
+
+        n_steps = int(round(duration / self.dt))
+        voltages = None
+        if record_interval is not None:
+            if record_neurons is None:
+                record_neurons = slice(None)
+            n_samples = n_steps // record_interval
+            n_recorded = len(np.arange(self.N)[record_neurons])
+            voltages = np.empty((n_samples, n_recorded), dtype=self.dtype)
+            self.sample_times = (self.t + record_interval * np.arange(1, n_samples + 1)) * self.dt
+
+        for i in range(1, n_steps + 1):
+            t = self.t
+            recorder.record(t, self.step())
+            if voltages is not None and i % record_interval == 0:
+                voltages[i // record_interval - 1] = self.v[record_neurons]
+
+        self.voltages = voltages
+        return recorder.firings
+
+
+def simulate_neuron(I, duration=300.0, dt=1.0, **params):
+    # Single-neuron convenience wrapper: returns (t, V, spike_times) in ms with V
+    # recorded after every step, for plots like those in fire-models.ipynb
+    population = IntegrateAndFirePopulation(1, dt=dt, I=I, **params)
+    v0 = population.v[0]
+    firings = population.run(duration, record_interval=1)
+    t = np.concatenate(([0.0], population.sample_times))
+    V = np.concatenate(([v0], population.voltages[:, 0]))
+    return t, V, (firings[:, 0] + 1) * dt
+
+
+if __name__ == "__main__":
+    # Throughput of a large LIF population driven by noisy input
+    N = int(float(sys.argv[1])) if len(sys.argv) > 1 else 100000
+    duration = 1000
+
+    def noisy_input(t, rng):
+        return 1.6 + 0.5 * rng.standard_normal(N, dtype=np.float32)
+
+    population = IntegrateAndFirePopulation(N, refractory=2.0, I=noisy_input, seed=0, dtype=np.float32)
+    start = time.perf_counter()
+    firings = population.run(duration, record_interval=10, record_neurons=slice(0, 100))
+    elapsed = time.perf_counter() - start
+    print(f"{N} LIF neurons x {duration} ms: {elapsed:.2f} s, "
+          f"{N * duration / elapsed / 1e6:.1f} M neuron-steps/s, "
+          f"mean rate {len(firings) / N / (duration / 1000):.1f} Hz")
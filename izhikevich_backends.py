@@ -0,0 +1,120 @@
+import importlib.util
+import warnings
+import numpy as np
+
+# Numba is optional; the NumPy backend is always available. It is imported only
+# when the numba backend is first created, as importing it takes longer than
+# starting either GUI.
+HAVE_NUMBA = importlib.util.find_spec('numba') is not None
+
+# A backend provides the per-step state updates of the Izhikevich model:
+#   fire(v, u, c, d)                                reset neurons with v >= 30, return their indices
+#   integrate(v, u, a, b, I, dt)                    network update (two half steps for v, then u)
+#   euler_step(v, u, I, a, b, c, d, dt, counts)     single-neuron forward-Euler step with reset
+# All of them update v and u in place on 1-D float64 arrays. The floating-point
+# operations happen in the same order in every backend so that rasters are identical.
+
+
+class NumpyBackend:
+    name = 'numpy'
+
+    def __init__(self):
+        self._scratch = (np.empty(0), np.empty(0))
+
+    def _buffers(self, n):
+        if len(self._scratch[0]) != n:
+            self._scratch = (np.empty(n), np.empty(n))
+        return self._scratch
+
+    def fire(self, v, u, c, d):
+        fired = np.where(v >= 30)[0]
+        v[fired] = c[fired]
+        u[fired] += d[fired]
+        return fired
+
+    def integrate(self, v, u, a, b, I, dt):
+        dv, tmp = self._buffers(len(v))
+        half_dt = 0.5 * dt
+        for _ in range(2):
+            # dv = 0.04 * v ** 2 + 5 * v + 140 - u + I
+            np.multiply(v, v, out=dv)
+            dv *= 0.04
+            np.multiply(v, 5, out=tmp)
+            dv += tmp
+            dv += 140
+            dv -= u
+            dv += I
+            dv *= half_dt
+            v += dv
+        # u += dt * a * (b * v - u)
+        np.multiply(b, v, out=tmp)
+        tmp -= u
+        np.multiply(a, dt, out=dv)
+        dv *= tmp
+        u += dv
+
+    def euler_step(self, v, u, I, a, b, c, d, dt, counts):
+        dv, tmp = self._buffers(len(v))
+        # dv = 0.04 * v * v + 5 * v + 140 - u + I
+        np.multiply(v, 0.04, out=dv)
+        dv += 5
+        dv *= v
+        dv += 140
+        dv -= u
+        dv += I
+        dv *= dt
+        v += dv
+        np.multiply(b, v, out=tmp)
+        tmp -= u
+        np.multiply(a, dt, out=dv)
+        dv *= tmp
+        u += dv
+
+        fired = v >= 30  # Threshold condition
+        if fired.any():
+            v[fired] = c[fired]
+            u[fired] += d[fired]
+            counts += fired
+
+
+class NumbaBackend:
+    name = 'numba'
+
+    def __init__(self):
+        if not HAVE_NUMBA:
+            raise ImportError("the 'numba' backend requires the numba package")
+        import izhikevich_numba_kernels as kernels
+        self._fire = kernels.fire_kernel
+        self._integrate = kernels.integrate_kernel
+        self._euler = kernels.euler_kernel
+
+    def fire(self, v, u, c, d):
+        return self._fire(v, u, c, d)
+
+    def integrate(self, v, u, a, b, I, dt):
+        self._integrate(v, u, a, b, I, dt)
+
+    def euler_step(self, v, u, I, a, b, c, d, dt, counts):
+        self._euler(v, u, I, a, b, c, d, dt, counts)
+
+
+BACKENDS = {
+    'numpy': NumpyBackend,
+    'numba': NumbaBackend,
+}
+
+
+def get_backend(backend='numpy'):
+    # Accepts a backend name, 'auto' (Numba when installed) or a backend instance.
+    # Asking for Numba without it installed falls back to NumPy with a warning.
+    if not isinstance(backend, str):
+        return backend
+    if backend == 'auto':
+        backend = 'numba' if HAVE_NUMBA else 'numpy'
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown backend {backend!r}, expected one of {sorted(BACKENDS)} or 'auto'")
+    if backend == 'numba' and not HAVE_NUMBA:
+        warnings.warn("numba is not installed, falling back to the NumPy backend")
+        backend = 'numpy'
+    return BACKENDS[backend]()
+
@@ -0,0 +1,103 @@
+import numpy as np
+from izhikevich_backends import get_backend
+from synaptic_connectivity import as_connectivity
+
+
+def preset_params(preset_values, names=None):
+    # Stack a {name: {'I', 'a', 'b', 'c', 'd'}} preset table into parameter arrays
+    if names is None:
+        names = list(preset_values.keys())
+    return names, {key: np.array([preset_values[name][key] for name in names], dtype=np.float64)
+                   for key in ('I', 'a', 'b', 'c', 'd')}
+
+
+def parameter_grid(**axes):
+    # parameter_grid(a=[...], I=[...]) -> {'a': grid, 'I': grid} with one grid axis per keyword
+    names = list(axes.keys())
+    grids = np.meshgrid(*[np.asarray(axes[name], dtype=np.float64) for name in names], indexing='ij')
+    return dict(zip(names, grids))
+
+
+def integrate_batch(I, a, b, c, d, v0=-65, duration=100, n_steps=1000, dt=None,
+                    voltage_step=None, noise_std=0.0, seed=None, record_v=True, backend='numpy'):
+    # Forward-Euler integration of any number of independent Izhikevich neurons at
+    # once, using the same update as IzhikevichGUI.calculate_v_and_u. All parameters
+    # broadcast together to the batch shape, e.g. (trials, neurons) or a parameter grid.
+    # voltage_step=(step, v) clamps v (and u = b * v) at that step, as for TC neurons.
+    arrays = np.broadcast_arrays(*[np.asarray(x, dtype=np.float64) for x in (I, a, b, c, d, v0)])
+    shape = arrays[0].shape
+    I, a, b, c, d, v0 = [np.ascontiguousarray(x).reshape(-1) for x in arrays]
+    backend = get_backend(backend)
+
+    t = np.linspace(0, duration, n_steps)
+    if dt is None:
+        dt = t[1] - t[0]
+    rng = np.random.default_rng(seed) if noise_std else None
+
+    v = v0.copy()
+    u = b * v
+    spike_counts = np.zeros(len(v), dtype=np.int64)
+    v_values = None
+    if record_v:
+        v_values = np.empty((n_steps, len(v)))
+        v_values[0] = v
+
+    for i in range(1, n_steps):
+        if voltage_step is not None and i == voltage_step[0]:
+            v[:] = voltage_step[1]
+            np.multiply(b, v, out=u)
+
+        drive = I
+        if rng is not None:
+            drive = I + noise_std * rng.standard_normal(len(I))
+        backend.euler_step(v, u, drive, a, b, c, d, dt, spike_counts)
+
+        if record_v:
+            v_values[i] = v
+
+    if record_v:
+        v_values = v_values.reshape((n_steps,) + shape)
+    return t, v_values, spike_counts.reshape(shape)
+
+
+def fi_curve(I_values, a=0.02, b=0.2, c=-65, d=8, duration=1000, dt=0.1, v0=-65, backend='numpy'):
+    # Firing rate (Hz) for every input current / parameter combination; the
+    # arguments broadcast together, e.g. I_values[np.newaxis, :] against a[:, np.newaxis]
+    n_steps = int(round(duration / dt)) + 1
+    _, _, spike_counts = integrate_batch(I_values, a, b, c, d, v0=v0, duration=duration, n_steps=n_steps,
+                                         record_v=False, backend=backend)
+    return spike_counts / (duration / 1000.0)
+
+
+def simulate_network_trials(n_trials, Ne, Ni, synaptic_weights, a, b, c, d, duration=1000, dt=1.0,
+                            seed=None, excitatory_scale=5.0, inhibitory_scale=2.0):
+    # Runs independent noise realisations of the same network as one
+    # (trials, neurons) state tensor. Returns an int32 (n_spikes, 3) array of
+    # [trial, time step, neuron index] rows.
+    N = Ne + Ni
+    connectivity = as_connectivity(synaptic_weights)
+    rng = np.random.default_rng(seed)
+    half_dt = 0.5 * dt
+    # Noise std and synaptic kicks are independent of dt, as in IzhikevichNetwork
+    scale = np.concatenate((excitatory_scale * np.ones(Ne), inhibitory_scale * np.ones(Ni))) / np.sqrt(dt)
+
+    v = -65 * np.ones((n_trials, N))
+    u = b * v
+    firings = []
+
+    for t in range(int(round(duration / dt))):
+        I = scale * rng.standard_normal((n_trials, N))
+        fired = v >= 30
+        trials, neurons = np.nonzero(fired)
+        if len(neurons):
+            firings.append(np.column_stack((trials, np.full(len(neurons), t), neurons)).astype(np.int32))
+            v[fired] = np.broadcast_to(c, v.shape)[fired]
+            u[fired] += np.broadcast_to(d, u.shape)[fired]
+            I += connectivity.propagate_batch(fired) / dt
+        v += half_dt * (0.04 * v ** 2 + 5 * v + 140 - u + I)
+        v += half_dt * (0.04 * v ** 2 + 5 * v + 140 - u + I)
+        u += dt * a * (b * v - u)
+
+    if not firings:
+        return np.empty((0, 3), dtype=np.int32)
+    return np.concatenate(firings)
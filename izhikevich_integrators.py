@@ -0,0 +1,303 @@
+import sys
+import math
+import time
+import numpy as np
+
+# Single-neuron integrators for the Izhikevich model
+#   dv/dt = 0.04 v^2 + 5 v + 140 - u + I,   du/dt = a (b v - u),   v >= 30: v <- c, u <- u + d
+# Every integrator returns (t, v_values, spike_times). Apart from 'euler', spike
+# times are located inside the step instead of being rounded to the next grid point.
+#
+#   euler      forward Euler with a v >= 30 check, as in IzhikevichGUI.calculate_v_and_u
+#   rk4        classic Runge-Kutta, threshold crossing located by bisection within the step
+#   exact_qif  v solved exactly (Riccati) with u frozen over the step, split symmetrically
+#              with exponential u updates; the crossing time of v = 30 is known in closed form
+#   adaptive   Bogacki-Shampine 3(2) with error control and bisection event location
+
+V_PEAK = 30.0
+P = 0.04
+SHIFT = 62.5          # v + SHIFT completes the square: 0.04 v^2 + 5 v = P (v + SHIFT)^2 - 156.25
+OFFSET = 156.25
+
+
+def _dv(v, u, I):
+    return 0.04 * v * v + 5 * v + 140 - u + I
+
+
+def _du(v, u, a, b):
+    return a * (b * v - u)
+
+
+def _euler(v, u, I, a, b, c, d, dt, n_steps, t0, t_out, v_out, spikes, stats):
+    for i in range(n_steps):
+        v += dt * _dv(v, u, I)
+        u += dt * _du(v, u, a, b)
+        stats['evaluations'] += 1
+        if v >= V_PEAK:  # Threshold condition
+            spikes.append(t0 + (i + 1) * dt)
+            v = c
+            u += d
+        t_out.append(t0 + (i + 1) * dt)
+        v_out.append(v)
+    return v, u
+
+
+def _rk4_step(v, u, I, a, b, h):
+    k1v, k1u = _dv(v, u, I), _du(v, u, a, b)
+    v2, u2 = v + 0.5 * h * k1v, u + 0.5 * h * k1u
+    k2v, k2u = _dv(v2, u2, I), _du(v2, u2, a, b)
+    v3, u3 = v + 0.5 * h * k2v, u + 0.5 * h * k2u
+    k3v, k3u = _dv(v3, u3, I), _du(v3, u3, a, b)
+    v4, u4 = v + h * k3v, u + h * k3u
+    k4v, k4u = _dv(v4, u4, I), _du(v4, u4, a, b)
+    return (v + h / 6 * (k1v + 2 * k2v + 2 * k3v + k4v),
+            u + h / 6 * (k1u + 2 * k2u + 2 * k3u + k4u))
+
+
+def _rk4(v, u, I, a, b, c, d, dt, n_steps, t0, t_out, v_out, spikes, stats):
+    for i in range(n_steps):
+        v_new, u_new = _rk4_step(v, u, I, a, b, dt)
+        stats['evaluations'] += 4
+        if v_new >= V_PEAK or not math.isfinite(v_new):
+            # Locate the crossing by bisection on the step length, then reset
+            lo, hi = 0.0, dt
+            while hi - lo > 1e-6:
+                mid = 0.5 * (lo + hi)
+                v_mid, _ = _rk4_step(v, u, I, a, b, mid)
+                stats['evaluations'] += 4
+                if v_mid >= V_PEAK or not math.isfinite(v_mid):
+                    hi = mid
+                else:
+                    lo = mid
+            _, u_spike = _rk4_step(v, u, I, a, b, hi)
+            spikes.append(t0 + i * dt + hi)
+            v_new, u_new = _rk4_step(c, u_spike + d, I, a, b, dt - hi)
+            stats['evaluations'] += 8
+        v, u = v_new, u_new
+        t_out.append(t0 + (i + 1) * dt)
+        v_out.append(v)
+    return v, u
+
+
+def _qif_advance(v, k, h):
+    # Exact solution of dv/dt = P (v + SHIFT)^2 + k - OFFSET over h. Returns the new v,
+    # or (None, t_cross) when v reaches V_PEAK within the step.
+    if v >= V_PEAK:
+        # Already at or past the peak (e.g. a large initial v): fires right away
+        return None, 0.0
+    w0 = v + SHIFT
+    w_peak = V_PEAK + SHIFT
+    D = k - OFFSET
+    if D > 0:
+        r = math.sqrt(D / P)
+        omega = math.sqrt(P * D)
+        phase = math.atan(w0 / r)
+        t_cross = (math.atan(w_peak / r) - phase) / omega
+        if t_cross <= h:
+            return None, t_cross
+        return r * math.tan(omega * h + phase) - SHIFT, None
+    if D < 0:
+        s = math.sqrt(-D / P)
+        if w0 > s:
+            # Above the unstable fixed point: runs away to the peak
+            C = (w0 - s) / (w0 + s)
+            t_cross = math.log(((w_peak - s) / (w_peak + s)) / C) / (2 * s * P)
+            if t_cross <= h:
+                return None, t_cross
+        if abs(w0) == s:
+            return v, None
+        C = (w0 - s) / (w0 + s)
+        e = C * math.exp(2 * s * P * h)
+        return s * (1 + e) / (1 - e) - SHIFT, None
+    if w0 > 0:
+        t_cross = 1 / (P * w0) - 1 / (P * w_peak)
+        if t_cross <= h:
+            return None, t_cross
+    return w0 / (1 - P * w0 * h) - SHIFT, None
+
+
+def _relax_u(u, v, a, b, h):
+    # Exact u update over h with v held fixed
+    return b * v + (u - b * v) * math.exp(-a * h)
+
+
+def _exact_qif(v, u, I, a, b, c, d, dt, n_steps, t0, t_out, v_out, spikes, stats):
+    # Strang splitting: half a step of u relaxing towards b v, the exact v step with
+    # u frozen, then the other half step of u. A spike splits the step, and each
+    # part gets its own opening and closing half step.
+    for i in range(n_steps):
+        remaining = dt
+        while True:
+            stats['evaluations'] += 1
+            u_start = u
+            u = _relax_u(u_start, v, a, b, 0.5 * remaining)
+            v_new, t_cross = _qif_advance(v, 140 - u + I, remaining)
+            if v_new is None:
+                # Open over half of the part that ends at the crossing instead,
+                # and locate the crossing again with that u
+                stats['evaluations'] += 1
+                u = _relax_u(u_start, v, a, b, 0.5 * t_cross)
+                v_check, t_check = _qif_advance(v, 140 - u + I, remaining)
+                if v_check is None:
+                    t_cross = t_check
+                spikes.append(t0 + (i + 1) * dt - remaining + t_cross)
+                u = _relax_u(u, V_PEAK, a, b, 0.5 * t_cross) + d
+                v = c
+                remaining -= t_cross
+                continue
+            v = v_new
+            u = _relax_u(u, v, a, b, 0.5 * remaining)
+            break
+        t_out.append(t0 + (i + 1) * dt)
+        v_out.append(v)
+    return v, u
+
+
+def _bs23_step(v, u, I, a, b, h):
+    # Bogacki-Shampine 3(2): returns the third-order solution and an error estimate
+    k1v, k1u = _dv(v, u, I), _du(v, u, a, b)
+    v2, u2 = v + 0.5 * h * k1v, u + 0.5 * h * k1u
+    k2v, k2u = _dv(v2, u2, I), _du(v2, u2, a, b)
+    v3, u3 = v + 0.75 * h * k2v, u + 0.75 * h * k2u
+    k3v, k3u = _dv(v3, u3, I), _du(v3, u3, a, b)
+    v_new = v + h * (2 / 9 * k1v + 1 / 3 * k2v + 4 / 9 * k3v)
+    u_new = u + h * (2 / 9 * k1u + 1 / 3 * k2u + 4 / 9 * k3u)
+    k4v, k4u = _dv(v_new, u_new, I), _du(v_new, u_new, a, b)
+    err_v = h * (-5 / 72 * k1v + 1 / 12 * k2v + 1 / 9 * k3v - 1 / 8 * k4v)
+    err_u = h * (-5 / 72 * k1u + 1 / 12 * k2u + 1 / 9 * k3u - 1 / 8 * k4u)
+    return v_new, u_new, err_v, err_u
+
+
+def _adaptive(v, u, I, a, b, c, d, duration, t0, t_out, v_out, spikes, stats,
+              rtol=1e-4, atol=1e-3, h_max=1.0, event_tol=1e-6):
+    t = t0
+    t_end = t0 + duration
+    h = min(h_max, 0.1)
+    while t_end - t > 1e-12:
+        h = min(h, t_end - t)
+        v_new, u_new, err_v, err_u = _bs23_step(v, u, I, a, b, h)
+        stats['evaluations'] += 3
+        if math.isfinite(v_new):
+            err = max(abs(err_v) / (atol + rtol * max(abs(v), abs(v_new))),
+                      abs(err_u) / (atol + rtol * max(abs(u), abs(u_new))))
+        else:
+            err = math.inf
+        if err > 1 and h > 1e-9:
+            h *= max(0.2, 0.9 * err ** (-1 / 3)) if math.isfinite(err) else 0.2
+            continue
+
+        if v_new >= V_PEAK:
+            # Event location: bisect the step length down to event_tol
+            lo, hi = 0.0, h
+            while hi - lo > event_tol:
+                mid = 0.5 * (lo + hi)
+                v_mid = _bs23_step(v, u, I, a, b, mid)[0]
+                stats['evaluations'] += 3
+                if v_mid >= V_PEAK:
+                    hi = mid
+                else:
+                    lo = mid
+            u_spike = _bs23_step(v, u, I, a, b, hi)[1]
+            t += hi
+            spikes.append(t)
+            t_out.append(t)
+            v_out.append(V_PEAK)
+            v, u = c, u_spike + d
+        else:
+            t += h
+            v, u = v_new, u_new
+        t_out.append(t)
+        v_out.append(v)
+        stats['steps'] += 1
+        h = min(h_max, h * min(5.0, 0.9 * err ** (-1 / 3) if err > 0 else 5.0))
+    return v, u
+
+
+FIXED_STEP_METHODS = {
+    'euler': _euler,
+    'rk4': _rk4,
+    'exact_qif': _exact_qif,
+}
+METHODS = tuple(FIXED_STEP_METHODS) + ('adaptive',)
+
+
+def integrate_neuron(I, a, b, c, d, v0=-65, duration=100, dt=0.1, method='exact_qif', voltage_step=None,
+                     stats=None, **adaptive_options):
+    # voltage_step=(time_ms, v) sets v (and u = b * v) at that time, as for TC neurons.
+    # dt is the output/step size for fixed-step methods and the largest step for 'adaptive'.
+    # Pass a dict as stats to receive the number of right-hand-side evaluations.
+    if method not in METHODS:
+        raise ValueError(f"Unknown integrator {method!r}, expected one of {METHODS}")
+    if stats is None:
+        stats = {}
+    stats.setdefault('evaluations', 0)
+    stats.setdefault('steps', 0)
+
+    segments = [(0.0, duration, v0)]
+    if voltage_step is not None:
+        segments = [(0.0, voltage_step[0], v0), (voltage_step[0], duration, voltage_step[1])]
+
+    t_out = [0.0]
+    v_out = [float(v0)]
+    spikes = []
+    v = float(v0)
+    u = b * v
+    for start, end, v_start in segments:
+        if start > 0:
+            v = float(v_start)
+            u = b * v
+        if method == 'adaptive':
+            adaptive_options.setdefault('h_max', dt)
+            v, u = _adaptive(v, u, I, a, b, c, d, end - start, start, t_out, v_out, spikes, stats,
+                             **adaptive_options)
+        else:
+            n_steps = int(round((end - start) / dt))
+            stats['steps'] += n_steps
+            v, u = FIXED_STEP_METHODS[method](v, u, I, a, b, c, d, dt, n_steps, start,
+                                               t_out, v_out, spikes, stats)
+    return np.array(t_out), np.array(v_out), np.array(spikes)
+
+
+def _match_spike_error(spikes, reference):
+    # Largest timing error over the spikes both trains share, matched in order
+    n = min(len(spikes), len(reference))
+    if n == 0:
+        return 0.0
+    return float(np.max(np.abs(spikes[:n] - reference[:n])))
+
+
+def accuracy_report(I=10, a=0.02, b=0.2, c=-65, d=8, duration=1000, dts=(0.1, 0.25, 0.5, 1.0),
+                    methods=METHODS, reference_dt=0.001):
+    # Spike-time accuracy and cost of every method and step size against a
+    # fine-step RK4 reference. Returns one dict per (method, dt).
+    _, _, reference = integrate_neuron(I, a, b, c, d, duration=duration, dt=reference_dt, method='rk4')
+    rows = []
+    for method in methods:
+        for dt in dts:
+            stats = {}
+            start = time.perf_counter()
+            _, _, spikes = integrate_neuron(I, a, b, c, d, duration=duration, dt=dt, method=method, stats=stats)
+            elapsed = time.perf_counter() - start
+            rows.append({
+                'method': method,
+                'dt': dt,
+                'spikes': len(spikes),
+                'reference_spikes': len(reference),
+                'max_spike_error_ms': _match_spike_error(spikes, reference),
+                'evaluations': stats['evaluations'],
+                'seconds': elapsed,
+            })
+    return rows
+
+
+def format_report(rows):
+    lines = [f"{'method':<10} {'dt':>6} {'spikes':>7} {'ref':>5} {'max err (ms)':>13} {'evals':>9} {'time (ms)':>10}"]
+    for row in rows:
+        lines.append(f"{row['method']:<10} {row['dt']:>6g} {row['spikes']:>7} {row['reference_spikes']:>5} "
+                     f"{row['max_spike_error_ms']:>13.4f} {row['evaluations']:>9} {1000 * row['seconds']:>10.2f}")
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    print(format_report(accuracy_report()))
+    sys.exit(0)
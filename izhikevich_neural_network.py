@@ -1,17 +1,45 @@
 import sys
-import json
+import time
+import threading
 import numpy as np
-import matplotlib.pyplot as plt
+from matplotlib.figure import Figure
 from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
 from PyQt5.QtWidgets import (
     QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, QPushButton,
     QSlider, QLabel, QLineEdit, QFileDialog, QSizePolicy, QCheckBox
 )
-from PyQt5.QtCore import Qt, QRect
-from PyQt5.QtGui import QPainter, QPen, QColor, QFont
+from PyQt5.QtCore import Qt, QRect, QThread, QTimer, pyqtSignal
+from PyQt5.QtGui import QPainter, QPen, QFont, QImage
+from izhikevich_simulation import IzhikevichNetwork, default_neuron_params, default_synaptic_weights
+from model_io import load_model, save_model, save_json_weights
+from raster_plot import RasterPlot
+from spike_recorder import SpikeRecorder
+
+def weights_to_rgba(weights, out=None):
+    # Darker red as the value increases, darker blue as it decreases, white for zero
+    intensity = np.minimum(255, 255 * np.abs(weights)).astype(np.uint8)
+    if out is None:
+        out = np.empty(weights.shape + (4,), dtype=np.uint8)
+    out[..., 0] = np.where(weights < 0, 255 - intensity, 255)
+    out[..., 1] = 255 - intensity
+    out[..., 2] = np.where(weights > 0, 255 - intensity, 255)
+    out[..., 3] = 255
+    return out
+
+def random_network(Ne, Ni, seed=None):
+    # (seed, (a, b, c, d), synaptic_weights) of a new random network. The seed is
+    # kept so that saved models record how they were generated.
+    if seed is None:
+        seed = int(np.random.SeedSequence().generate_state(1)[0])
+    rng = np.random.default_rng(seed)
+    params = default_neuron_params(Ne, Ni, rng)
+    return seed, params, default_synaptic_weights(Ne, Ni, rng)
+
 
 class CanvasWidget(QWidget):
-    def __init__(self, Ne, Ni):
+    # With initialize=False the canvas starts empty (all-zero weights) until
+    # set_network is called, as MainWindow does once its window is up
+    def __init__(self, Ne, Ni, initialize=True):
         super().__init__()
         self.Ne = Ne
         self.Ni = Ni
@@ -25,43 +53,67 @@ class CanvasWidget(QWidget):
 
         # Initialize the synaptic weights with random values
         self.synaptic_weights = np.zeros((self.full_height, self.full_width), dtype=np.float32)
-        self.initialize_synaptic_weights()
-
-        self.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Expanding)
+        self.seed = None
+        if initialize:
+            self.initialize_synaptic_weights()
 
-    def initialize_synaptic_weights(self):
-        Ne = self.Ne
-        Ni = self.Ni
-
-        # Random values for excitatory and inhibitory neurons
-        re = np.random.rand(Ne)
-        ri = np.random.rand(Ni)
+        # Colormapped weights at display resolution, wrapping self._image_buffer
+        self._image = None
+        self._image_buffer = None
+        self._image_rows = None
+        self._image_cols = None
+        self._dirty_rects = []
 
-        # Initialize neuron parameters
-        self.a = np.concatenate([0.02 * np.ones(Ne), 0.02 + 0.08 * ri])
-        self.b = np.concatenate([0.2 * np.ones(Ne), 0.25 - 0.05 * ri])
-        self.c = np.concatenate([-65 + 15 * re**2, -65 * np.ones(Ni)])
-        self.d = np.concatenate([8 - 6 * re**2, 2 * np.ones(Ni)])
+        self._brush_mask = None
+        self._brush_mask_size = None
 
-        # Synaptic weight matrix: 0.5 for excitatory, -1 for inhibitory
-        excitatory_weights = 0.5 * np.random.rand(Ne + Ni, Ne)
-        inhibitory_weights = -np.random.rand(Ne + Ni, Ni)
-        self.synaptic_weights = np.hstack([excitatory_weights, inhibitory_weights])
+        self.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Expanding)
 
-        # Set self-connections to 0
-        np.fill_diagonal(self.synaptic_weights, 0)
+    def initialize_synaptic_weights(self):
+        self.set_network(*random_network(self.Ne, self.Ni))
 
+    def set_network(self, seed, params, synaptic_weights):
+        self.seed = seed
+        self.set_neuron_params(*params)
+        self.set_canvas_data(synaptic_weights)
 
     def update_display_canvas(self):
         self.update()
 
+    def invalidate_image(self, rect=None):
+        # rect is (row_start, row_end, col_start, col_end) in weight-matrix coordinates;
+        # None drops the whole cached image
+        if rect is None:
+            self._image = None
+        elif self._image is not None:
+            self._dirty_rects.append(rect)
+
+    def update_image(self, canvas_width, canvas_height):
+        if self._image is None or self._image.width() != canvas_width or self._image.height() != canvas_height:
+            # Map pixel coordinates to the full synaptic weight matrix
+            self._image_rows = (np.arange(canvas_height) * self.full_height / canvas_height).astype(int)
+            self._image_cols = (np.arange(canvas_width) * self.full_width / canvas_width).astype(int)
+            self._image_buffer = weights_to_rgba(self.synaptic_weights[np.ix_(self._image_rows, self._image_cols)])
+            self._image = QImage(self._image_buffer.data, canvas_width, canvas_height,
+                                 4 * canvas_width, QImage.Format_RGBA8888)
+            self._dirty_rects = []
+            return
+
+        rows, cols = self._image_rows, self._image_cols
+        for row_start, row_end, col_start, col_end in self._dirty_rects:
+            # Recolor only the pixels that sample the touched part of the matrix
+            r0, r1 = np.searchsorted(rows, [row_start, row_end])
+            c0, c1 = np.searchsorted(cols, [col_start, col_end])
+            if r0 < r1 and c0 < c1:
+                weights_to_rgba(self.synaptic_weights[np.ix_(rows[r0:r1], cols[c0:c1])],
+                                out=self._image_buffer[r0:r1, c0:c1])
+        self._dirty_rects = []
+
     def resizeEvent(self, event):
         self.update_display_canvas()
         super().resizeEvent(event)
 
-    def paintEvent(self, event):
-        painter = QPainter(self)
-
+    def canvas_geometry(self):
         # Calculate the size and position of the canvas based on the current window size
         widget_width = self.width()
         widget_height = self.height()
@@ -76,6 +128,21 @@ class CanvasWidget(QWidget):
 
         x_offset = (widget_width - canvas_width) // 2
         y_offset = (widget_height - canvas_height) // 2
+        return canvas_width, canvas_height, x_offset, y_offset
+
+    def matrix_rect_to_widget(self, rect):
+        # Widget-space QRect covering a (row_start, row_end, col_start, col_end) matrix block
+        canvas_width, canvas_height, x_offset, y_offset = self.canvas_geometry()
+        row_start, row_end, col_start, col_end = rect
+        left = x_offset + col_start * canvas_width // self.full_width
+        top = y_offset + row_start * canvas_height // self.full_height
+        right = x_offset + -(-col_end * canvas_width // self.full_width)
+        bottom = y_offset + -(-row_end * canvas_height // self.full_height)
+        return QRect(left - 1, top - 1, right - left + 2, bottom - top + 2)
+
+    def paintEvent(self, event):
+        painter = QPainter(self)
+        canvas_width, canvas_height, x_offset, y_offset = self.canvas_geometry()
 
         # Draw neuron indices on the top and left
         painter.setPen(QPen(Qt.black))
@@ -87,25 +154,9 @@ class CanvasWidget(QWidget):
             painter.drawText(x_offset - 25, y_offset + j * canvas_height // self.full_height + 5, str(j))
 
         # Draw the synaptic weights
-        for y in range(canvas_height):
-            for x in range(canvas_width):
-                # Map pixel coordinates to the full synaptic weight matrix
-                syn_x = int(x * self.full_width / canvas_width)
-                syn_y = int(y * self.full_height / canvas_height)
-                value = self.synaptic_weights[syn_y, syn_x]
-                
-                # Map the value to a color
-                if value > 0:
-                    intensity = int(min(255, 255 * value))
-                    color = QColor(255, 255 - intensity, 255 - intensity)  # Darker red as the value increases
-                elif value < 0:
-                    intensity = int(min(255, 255 * abs(value)))
-                    color = QColor(255 - intensity, 255 - intensity, 255)  # Darker blue as the value decreases
-                else:
-                    color = QColor(255, 255, 255)  # White for zero
-
-                painter.setPen(QPen(color))
-                painter.drawPoint(x + x_offset, y + y_offset)
+        if canvas_width > 0 and canvas_height > 0:
+            self.update_image(canvas_width, canvas_height)
+            painter.drawImage(x_offset, y_offset, self._image)
 
         # Draw the line separating excitatory and inhibitory neuron weights
         sep_line_position = int(self.Ne * canvas_width / self.full_width) + x_offset
@@ -113,60 +164,81 @@ class CanvasWidget(QWidget):
         painter.drawLine(sep_line_position, y_offset, sep_line_position, y_offset + canvas_height)
 
     def mouseMoveEvent(self, event):
-        self.apply_brush(event.x(), event.y())
-        self.update()
+        self.brush_at(event.x(), event.y())
 
     def mousePressEvent(self, event):
-        self.apply_brush(event.x(), event.y())
-        self.update()
+        self.brush_at(event.x(), event.y())
 
-    def apply_brush(self, x, y):
-        # Calculate the size and position of the canvas based on the current window size
-        widget_width = self.width()
-        widget_height = self.height()
-
-        aspect_ratio = self.full_width / self.full_height
-        if widget_width / widget_height > aspect_ratio:
-            canvas_height = widget_height
-            canvas_width = int(widget_height * aspect_ratio)
-        else:
-            canvas_width = widget_width
-            canvas_height = int(widget_width / aspect_ratio)
-
-        x_offset = (widget_width - canvas_width) // 2
-        y_offset = (widget_height - canvas_height) // 2
-
-        if x_offset <= x <= x_offset + canvas_width and y_offset <= y <= y_offset + canvas_height:
-            # Map the click coordinates to the full synaptic weight matrix
-            syn_x = int((x - x_offset) * self.full_width / canvas_width)
-            syn_y = int((y - y_offset) * self.full_height / canvas_height)
-
-            for i in range(-self.brush_size, self.brush_size):
-                for j in range(-self.brush_size, self.brush_size):
-                    if 0 <= syn_x + i < self.full_width and 0 <= syn_y + j < self.full_height:
-                        if np.sqrt(i ** 2 + j ** 2) <= self.brush_size:
-                            if not (self.window().prevent_self_connection_toggle.isChecked() and syn_x + i == syn_y + j):
-                                if self.relative_brush:
-                                    self.synaptic_weights[syn_y + j, syn_x + i] += self.brush_strength
-                                else:
-                                    self.synaptic_weights[syn_y + j, syn_x + i] = self.brush_strength
-
-        self.update_display_canvas()
+    def brush_at(self, x, y):
+        dirty_rect = self.apply_brush(x, y)
+        if dirty_rect is not None:
+            self.update(self.matrix_rect_to_widget(dirty_rect))
 
         if self.window().auto_update:
             self.window().update_simulation()
 
+    def brush_mask(self):
+        # Disk of radius brush_size over offsets -brush_size..brush_size-1, cached per size
+        if self._brush_mask is None or self._brush_mask_size != self.brush_size:
+            offsets = np.arange(-self.brush_size, self.brush_size)
+            self._brush_mask = offsets[:, np.newaxis] ** 2 + offsets[np.newaxis, :] ** 2 <= self.brush_size ** 2
+            self._brush_mask_size = self.brush_size
+        return self._brush_mask
+
+    def apply_brush(self, x, y):
+        # Returns the touched (row_start, row_end, col_start, col_end) block, or None
+        canvas_width, canvas_height, x_offset, y_offset = self.canvas_geometry()
+
+        if not (x_offset <= x <= x_offset + canvas_width and y_offset <= y <= y_offset + canvas_height):
+            return None
+
+        # Map the click coordinates to the full synaptic weight matrix
+        syn_x = int((x - x_offset) * self.full_width / canvas_width)
+        syn_y = int((y - y_offset) * self.full_height / canvas_height)
+
+        row_start = max(0, syn_y - self.brush_size)
+        row_end = min(self.full_height, syn_y + self.brush_size)
+        col_start = max(0, syn_x - self.brush_size)
+        col_end = min(self.full_width, syn_x + self.brush_size)
+        if row_start >= row_end or col_start >= col_end:
+            return None
+
+        mask_row = row_start - (syn_y - self.brush_size)
+        mask_col = col_start - (syn_x - self.brush_size)
+        mask = self.brush_mask()[mask_row:mask_row + row_end - row_start, mask_col:mask_col + col_end - col_start]
+
+        if self.window().prevent_self_connection_toggle.isChecked():
+            rows = np.arange(row_start, row_end)[:, np.newaxis]
+            cols = np.arange(col_start, col_end)[np.newaxis, :]
+            mask = mask & (rows != cols)
+
+        region = self.synaptic_weights[row_start:row_end, col_start:col_end]
+        if self.relative_brush:
+            region[mask] += self.brush_strength
+        else:
+            region[mask] = self.brush_strength
+
+        dirty_rect = (row_start, row_end, col_start, col_end)
+        self.invalidate_image(dirty_rect)
+        return dirty_rect
 
     def get_canvas_data(self):
         return self.synaptic_weights
 
-    def set_canvas_data(self, data):
+    def set_canvas_data(self, data, Ne=None, Ni=None):
         self.synaptic_weights = data
+        self.full_height, self.full_width = data.shape
+        if Ne is not None and Ni is not None:
+            self.Ne, self.Ni = Ne, Ni
+        self.invalidate_image()
         self.update_display_canvas()
 
     def get_neuron_params(self):
         return self.a, self.b, self.c, self.d
 
+    def set_neuron_params(self, a, b, c, d):
+        self.a, self.b, self.c, self.d = a, b, c, d
+
     def set_brush_size(self, size):
         self.brush_size = size
 
@@ -176,12 +248,118 @@ class CanvasWidget(QWidget):
     def set_brush_mode(self, relative):
         self.relative_brush = relative
 
+class SimulationThread(QThread):
+    # Runs simulations off the UI thread. Requests are coalesced: only the newest
+    # one is kept, and a run in progress is abandoned as soon as a newer request
+    # arrives, so results always reflect the latest edit. A request holds the live
+    # weight matrix, which is copied only when the worker picks it up; an edit that
+    # lands during the copy submits a newer request, so a torn snapshot is never shown.
+    result_ready = pyqtSignal(object, float)  # firings, time the request was made
+    failed = pyqtSignal(str)
+
+    def __init__(self, duration=1000, check_interval=50):
+        super().__init__()
+        self.duration = duration
+        self.check_interval = check_interval
+        self._condition = threading.Condition()
+        self._request = None
+        self._stopping = False
+
+    def submit(self, Ne, Ni, synaptic_weights, a, b, c, d):
+        with self._condition:
+            self._request = (Ne, Ni, synaptic_weights, a, b, c, d, time.perf_counter())
+            self._condition.notify()
+
+    def stop(self):
+        with self._condition:
+            self._stopping = True
+            self._condition.notify()
+        self.wait()
+
+    def _superseded(self):
+        return self._request is not None or self._stopping
+
+    def run(self):
+        while True:
+            with self._condition:
+                while self._request is None and not self._stopping:
+                    self._condition.wait()
+                if self._stopping:
+                    return
+                Ne, Ni, synaptic_weights, a, b, c, d, request_time = self._request
+                self._request = None
+
+            try:
+                self._simulate(Ne, Ni, synaptic_weights.copy(), a, b, c, d, request_time)
+            except Exception as error:
+                # Keep serving requests; the next edit may well be valid
+                self.failed.emit(f"{type(error).__name__}: {error}")
+
+    def _simulate(self, Ne, Ni, synaptic_weights, a, b, c, d, request_time):
+        network = IzhikevichNetwork(Ne, Ni, synaptic_weights, a, b, c, d)
+        recorder = SpikeRecorder(network.N)
+        for step in range(self.duration):
+            if step % self.check_interval == 0 and self._superseded():
+                return
+            recorder.record(network.t, network.step())
+        self.result_ready.emit(recorder.firings, request_time)
+
+class NetworkInitThread(QThread):
+    # Builds the initial random network off the UI thread
+    ready = pyqtSignal(object)
+
+    def __init__(self, Ne, Ni):
+        super().__init__()
+        self.Ne = Ne
+        self.Ni = Ni
+
+    def run(self):
+        self.ready.emit(random_network(self.Ne, self.Ni))
+
+
 class MainWindow(QMainWindow):
+    # The window is shown with an empty canvas; the random network is built in a
+    # NetworkInitThread started after the first paint, and its first simulation
+    # runs on the SimulationThread like any other, so startup never waits on them.
+    network_ready = pyqtSignal()
+
     def __init__(self):
         super().__init__()
         self.auto_update = True
+        self.last_latency = None
+        self.initialized = False
+        self.simulation_thread = SimulationThread()
+        self.simulation_thread.result_ready.connect(self.plot_firings)
+        self.simulation_thread.failed.connect(self.show_simulation_error)
+        self.simulation_thread.start()
+        self.init_thread = None
         self.initUI()
 
+    def showEvent(self, event):
+        super().showEvent(event)
+        if self.init_thread is None:
+            # Queued behind the first paint of the window
+            QTimer.singleShot(0, self.start_initialization)
+
+    def start_initialization(self):
+        self.init_thread = NetworkInitThread(self.canvas_widget.Ne, self.canvas_widget.Ni)
+        self.init_thread.ready.connect(self.set_initial_network)
+        self.init_thread.start()
+
+    def set_initial_network(self, network):
+        self.canvas_widget.set_network(*network)
+        for widget in self.network_widgets:
+            widget.setEnabled(True)
+        self.initialized = True
+        self.network_ready.emit()
+        self.update_simulation()
+
+    def closeEvent(self, event):
+        if self.init_thread is not None:
+            self.init_thread.wait()
+        self.simulation_thread.stop()
+        super().closeEvent(event)
+
     def initUI(self):
         self.setWindowTitle("Synaptic Weight Simulator")
         self.setGeometry(100, 100, 1300, 700)
@@ -195,7 +373,7 @@ class MainWindow(QMainWindow):
 
         # Left side: Canvas and controls
         canvas_layout = QVBoxLayout()
-        self.canvas_widget = CanvasWidget(Ne, Ni)
+        self.canvas_widget = CanvasWidget(Ne, Ni, initialize=False)
         canvas_layout.addWidget(self.canvas_widget)
 
         # Labels to indicate the neuron types
@@ -262,10 +440,12 @@ class MainWindow(QMainWindow):
         # Save and Load Buttons
         file_buttons_layout = QHBoxLayout()
         save_button = QPushButton("Save")
+        save_button.setEnabled(False)
         save_button.clicked.connect(self.save_synaptic_weights)
         file_buttons_layout.addWidget(save_button)
 
         load_button = QPushButton("Load")
+        load_button.setEnabled(False)
         load_button.clicked.connect(self.load_synaptic_weights)
         file_buttons_layout.addWidget(load_button)
 
@@ -275,16 +455,26 @@ class MainWindow(QMainWindow):
 
         # Right side: Firing plot
         plot_layout = QVBoxLayout()
-        self.figure, self.ax = plt.subplots(figsize=(5, 4))
+        self.figure = Figure(figsize=(5, 4))
+        self.ax = self.figure.add_subplot(111)
         self.canvas = FigureCanvas(self.figure)
         plot_layout.addWidget(self.canvas)
+        self.raster = RasterPlot(self.ax, Ne + Ni, 1000)
+
+        self.latency_label = QLabel("Edit to raster: -")
+        plot_layout.addWidget(self.latency_label)
 
         self.update_button = QPushButton("Update")
+        self.update_button.setEnabled(False)
         self.update_button.clicked.connect(self.update_simulation)
         plot_layout.addWidget(self.update_button)
 
         layout.addLayout(plot_layout)
 
+        # Disabled until the initial network is ready
+        self.network_widgets = [self.canvas_widget, save_button, load_button, self.update_button]
+        self.canvas_widget.setEnabled(False)
+
     def update_brush_size(self, value):
         self.canvas_widget.set_brush_size(value)
         self.brush_size_input.setText(str(value))
@@ -318,57 +508,59 @@ class MainWindow(QMainWindow):
         if not self.auto_update:
             return
 
-        Ne, Ni = 800, 200
-        S = synaptic_weights
-
-        v = -65 * np.ones(Ne + Ni)
-        u = b * v
-        firings = []
-        t = 0
-
-        for _ in range(1000):
-            I = np.concatenate((5 * np.random.randn(Ne), 2 * np.random.randn(Ni)))
-            fired = np.where(v >= 30)[0]
-            firings.extend([[t, neuron] for neuron in fired])
-            v[fired] = c[fired]
-            u[fired] += d[fired]
-            I += np.sum(S[:, fired], axis=1)
-            v += 0.5 * (0.04 * v ** 2 + 5 * v + 140 - u + I)
-            v += 0.5 * (0.04 * v ** 2 + 5 * v + 140 - u + I)
-            u += a * (b * v - u)
-            t += 1
-
-        # Plot firings
-        self.ax.cla()
-        if firings:
-            firing_data = np.array(firings)
-            self.ax.scatter(firing_data[:, 0], firing_data[:, 1], s=1)
-        self.ax.set_xlim([0, 1000])
-        self.ax.set_ylim([0, Ne + Ni])
-        self.ax.set_xlabel('Time (ms)')
-        self.ax.set_ylabel('Neuron Index')
-        self.ax.set_title('Neuron Firings')
-        self.canvas.draw()
+        # The worker snapshots the weights when it starts the run, not on every edit
+        Ne, Ni = self.canvas_widget.Ne, self.canvas_widget.Ni
+        self.simulation_thread.submit(Ne, Ni, synaptic_weights, a, b, c, d)
+
+    def plot_firings(self, firings, request_time):
+        if self.raster.N != self.canvas_widget.full_height:
+            # A loaded model changed the network size
+            self.raster.set_size(self.canvas_widget.full_height)
+        self.raster.set_firings(firings)
+
+        self.last_latency = time.perf_counter() - request_time
+        self.latency_label.setText(f"Edit to raster: {1000 * self.last_latency:.0f} ms")
+
+    def show_simulation_error(self, message):
+        self.latency_label.setText(f"Simulation failed: {message}")
 
     def save_synaptic_weights(self):
         options = QFileDialog.Options()
         options |= QFileDialog.DontUseNativeDialog
-        file_name, _ = QFileDialog.getSaveFileName(self, "Save Synaptic Weights", "", "JSON Files (*.json);;All Files (*)", options=options)
+        file_name, selected_filter = QFileDialog.getSaveFileName(
+            self, "Save Synaptic Weights", "",
+            "Model Files (*.npz);;JSON Files (*.json);;All Files (*)", options=options)
         if file_name:
-            with open(file_name, 'w') as file:
-                data = self.canvas_widget.get_canvas_data().tolist()
-                json.dump(data, file)
+            canvas = self.canvas_widget
+            if file_name.endswith('.json') or (selected_filter.startswith("JSON") and '.' not in file_name):
+                if not file_name.endswith('.json'):
+                    file_name += '.json'
+                save_json_weights(file_name, canvas.get_canvas_data())
+                return
+            if not file_name.endswith('.npz'):
+                file_name += '.npz'
+            a, b, c, d = canvas.get_neuron_params()
+            save_model(file_name, canvas.get_canvas_data(), a, b, c, d,
+                       Ne=canvas.Ne, Ni=canvas.Ni, seed=canvas.seed, compress=True)
 
     def load_synaptic_weights(self):
         options = QFileDialog.Options()
         options |= QFileDialog.DontUseNativeDialog
-        file_name, _ = QFileDialog.getOpenFileName(self, "Load Synaptic Weights", "", "JSON Files (*.json);;All Files (*)", options=options)
+        file_name, _ = QFileDialog.getOpenFileName(
+            self, "Load Synaptic Weights", "",
+            "Model Files (*.npz *.json);;All Files (*)", options=options)
         if file_name:
-            with open(file_name, 'r') as file:
-                data = json.load(file)
-                self.canvas_widget.set_canvas_data(np.array(data))
-                if self.auto_update:
-                    self.update_simulation()
+            model = load_model(file_name)
+            synaptic_weights = model['synaptic_weights']
+            if not isinstance(synaptic_weights, np.ndarray):
+                synaptic_weights = synaptic_weights.to_dense()
+            self.canvas_widget.set_canvas_data(synaptic_weights, model['Ne'], model['Ni'])
+            if all(name in model for name in ('a', 'b', 'c', 'd')):
+                self.canvas_widget.set_neuron_params(model['a'], model['b'], model['c'], model['d'])
+            if model['seed'] is not None:
+                self.canvas_widget.seed = model['seed']
+            if self.auto_update:
+                self.update_simulation()
 
 if __name__ == "__main__":
     app = QApplication(sys.argv)
@@ -0,0 +1,49 @@
+import numba
+import numpy as np
+
+# Compiled kernels of the 'numba' backend (see izhikevich_backends), in their own
+# module so that numba is only imported when the backend is first used.
+
+
+@numba.njit(cache=True, nogil=True)
+def fire_kernel(v, u, c, d):
+    n_fired = 0
+    for i in range(len(v)):
+        if v[i] >= 30:
+            n_fired += 1
+    fired = np.empty(n_fired, dtype=np.int64)
+    k = 0
+    for i in range(len(v)):
+        if v[i] >= 30:
+            fired[k] = i
+            k += 1
+            v[i] = c[i]
+            u[i] += d[i]
+    return fired
+
+
+@numba.njit(cache=True, nogil=True)
+def integrate_kernel(v, u, a, b, I, dt):
+    half_dt = 0.5 * dt
+    for i in range(len(v)):
+        vi = v[i]
+        ui = u[i]
+        for _ in range(2):
+            vi += (0.04 * (vi * vi) + 5 * vi + 140 - ui + I[i]) * half_dt
+        v[i] = vi
+        u[i] = ui + (a[i] * dt) * (b[i] * vi - ui)
+
+
+@numba.njit(cache=True, nogil=True)
+def euler_kernel(v, u, I, a, b, c, d, dt, counts):
+    for i in range(len(v)):
+        vi = v[i]
+        ui = u[i]
+        vi += ((vi * 0.04 + 5) * vi + 140 - ui + I[i]) * dt
+        ui += (a[i] * dt) * (b[i] * vi - ui)
+        if vi >= 30:
+            vi = c[i]
+            ui += d[i]
+            counts[i] += 1
+        v[i] = vi
+        u[i] = ui
@@ -0,0 +1,374 @@
+import sys
+import json
+import argparse
+import numpy as np
+from input_drives import ReplayedCurrent, ThalamicNoise, population_scale
+from izhikevich_backends import BACKENDS, get_backend
+from model_io import load_model, save_model
+from plasticity import STDP
+from simulation_checkpoint import restore_checkpoint, run_with_checkpoints
+from simulation_profiler import Profiler, print_window
+from simulation_sinks import NpyAppendSink, stream_to_sinks
+from spike_recorder import SpikeRecorder
+from synaptic_connectivity import DelayedConnectivity, SparseConnectivity, as_connectivity, random_delays
+
+
+def default_neuron_params(Ne, Ni, rng):
+    # Random values for excitatory and inhibitory neurons
+    re = rng.random(Ne)
+    ri = rng.random(Ni)
+
+    a = np.concatenate([0.02 * np.ones(Ne), 0.02 + 0.08 * ri])
+    b = np.concatenate([0.2 * np.ones(Ne), 0.25 - 0.05 * ri])
+    c = np.concatenate([-65 + 15 * re**2, -65 * np.ones(Ni)])
+    d = np.concatenate([8 - 6 * re**2, 2 * np.ones(Ni)])
+    return a, b, c, d
+
+
+def default_synaptic_weights(Ne, Ni, rng):
+    # Synaptic weight matrix: 0.5 for excitatory, -1 for inhibitory
+    excitatory_weights = 0.5 * rng.random((Ne + Ni, Ne))
+    inhibitory_weights = -rng.random((Ne + Ni, Ni))
+    S = np.hstack([excitatory_weights, inhibitory_weights])
+
+    # Set self-connections to 0
+    np.fill_diagonal(S, 0)
+    return S
+
+
+def thalamic_input(Ne, Ni, excitatory_scale=5.0, inhibitory_scale=2.0, block_steps=100, dt=1.0):
+    # Gaussian noise drawn block_steps steps at a time; the values equal those of
+    # per-step draws of excitatory then inhibitory noise from the same generator
+    return ThalamicNoise(population_scale((Ne, Ni), (excitatory_scale, inhibitory_scale)), dt=dt,
+                         block_steps=block_steps)
+
+
+def rng_state(rng):
+    # The bit generator state of a np.random.Generator as a JSON string array
+    return np.array(json.dumps(rng.bit_generator.state))
+
+
+def set_rng_state(rng, state):
+    rng.bit_generator.state = json.loads(str(state))
+
+
+class IzhikevichNetwork:
+    def __init__(self, Ne=800, Ni=200, synaptic_weights=None, a=None, b=None, c=None, d=None,
+                 dt=1.0, seed=None, input_generator=None, connection_probability=None, backend='numpy',
+                 plasticity=None, delays=None, max_delay=20, profiler=None):
+        self.Ne = Ne
+        self.Ni = Ni
+        self.N = Ne + Ni
+        self.dt = dt
+        self.seed = seed
+        self.rng = np.random.default_rng(seed)
+        self.backend = get_backend(backend)
+
+        if a is None or b is None or c is None or d is None:
+            a, b, c, d = default_neuron_params(Ne, Ni, self.rng)
+        self.a = np.ascontiguousarray(a, dtype=np.float64)
+        self.b = np.ascontiguousarray(b, dtype=np.float64)
+        self.c = np.ascontiguousarray(c, dtype=np.float64)
+        self.d = np.ascontiguousarray(d, dtype=np.float64)
+
+        # synaptic_weights may be a dense (N, N) array, a scipy.sparse matrix or a
+        # connectivity object; a connection probability builds a sparse network
+        if synaptic_weights is None:
+            if connection_probability is None:
+                synaptic_weights = default_synaptic_weights(Ne, Ni, self.rng)
+            else:
+                synaptic_weights = SparseConnectivity.random(Ne, Ni, connection_probability, self.rng)
+        self.synaptic_weights = synaptic_weights
+        self.connectivity = as_connectivity(synaptic_weights)
+
+        # Integer conduction delays in steps (see DelayedConnectivity); 'random'
+        # draws 1..max_delay ms excitatory and 1 ms inhibitory delays
+        if isinstance(delays, str) and delays == 'random':
+            delays = random_delays(self.connectivity, Ne, max_delay, self.rng, dt=dt)
+        self.delays = delays
+        if delays is not None:
+            self.connectivity = DelayedConnectivity(self.connectivity, delays)
+
+        # The generator state once the model is drawn, where the input stream
+        # starts; a saved model keeps it so that loading the model replays the input
+        self.input_rng_state = rng_state(self.rng)
+
+        if input_generator is None:
+            input_generator = self.default_input()
+        self.input_generator = input_generator
+
+        # A plasticity rule (e.g. plasticity.STDP) updates the weights in place
+        # after every step
+        self.plasticity = plasticity
+        if plasticity is not None:
+            plasticity.attach(self.connectivity, Ne, dt)
+
+        # A simulation_profiler.Profiler times the phases of every step
+        self.profiler = profiler
+
+        self.reset()
+
+    def default_input(self):
+        # Input used when no input_generator is given
+        return thalamic_input(self.Ne, self.Ni, dt=self.dt)
+
+    def reset(self):
+        self.v = -65 * np.ones(self.N)
+        self.u = self.b * self.v
+        self.t = 0
+        if hasattr(self.input_generator, 'reset'):
+            self.input_generator.reset()
+        if self.plasticity is not None:
+            self.plasticity.reset()
+        if hasattr(self.connectivity, 'reset'):
+            self.connectivity.reset()
+
+    def _stateful_parts(self):
+        # (prefix, part) pairs whose get_state() belongs in a checkpoint
+        parts = [('input', self.input_generator), ('connectivity', self.connectivity),
+                 ('plasticity', self.plasticity)]
+        return [(prefix, part) for prefix, part in parts if hasattr(part, 'get_state')]
+
+    def get_state(self):
+        # Everything the next steps depend on besides the fixed model, as a flat
+        # dict of arrays; see simulation_checkpoint for saving it to disk
+        state = {'v': self.v.copy(), 'u': self.u.copy(), 't': np.array(self.t), 'rng': rng_state(self.rng)}
+        for prefix, part in self._stateful_parts():
+            state.update({f"{prefix}/{name}": value for name, value in part.get_state().items()})
+        return state
+
+    def set_state(self, state):
+        # Continues bit-identically from a get_state() of a network built the same way
+        if len(state['v']) != self.N:
+            raise ValueError(f"State of {len(state['v'])} neurons does not fit a network of {self.N}")
+        self.v = np.array(state['v'], dtype=np.float64)
+        self.u = np.array(state['u'], dtype=np.float64)
+        self.t = int(state['t'])
+        set_rng_state(self.rng, state['rng'])
+        for prefix, part in self._stateful_parts():
+            prefix += '/'
+            part.set_state({name[len(prefix):]: value for name, value in state.items() if name.startswith(prefix)})
+
+    def synaptic_input(self, fired):
+        # A presynaptic spike kicks v by the synaptic weight whatever the step,
+        # so its current is weight / dt over one step
+        I_syn = self.connectivity.propagate(fired)
+        if self.dt != 1.0:
+            I_syn /= self.dt
+        return I_syn
+
+    def step(self):
+        if self.profiler is not None:
+            return self._profiled_step()
+        I = self.input_generator(self.t, self.rng)
+        fired = self.backend.fire(self.v, self.u, self.c, self.d)
+        I += self.synaptic_input(fired)
+        if self.plasticity is not None:
+            self.plasticity.update(fired)
+
+        # Two half steps for v for numerical stability, as in Izhikevich (2003)
+        self.backend.integrate(self.v, self.u, self.a, self.b, I, self.dt)
+        self.t += 1
+        return fired
+
+    def _profiled_step(self):
+        # step() with a profiler lap after every phase
+        profiler = self.profiler
+        profiler.begin()
+        I = self.input_generator(self.t, self.rng)
+        profiler.lap('input')
+        fired = self.backend.fire(self.v, self.u, self.c, self.d)
+        profiler.lap('fire')
+        I += self.synaptic_input(fired)
+        profiler.lap('propagate')
+        if self.plasticity is not None:
+            self.plasticity.update(fired)
+            profiler.lap('plasticity')
+        self.backend.integrate(self.v, self.u, self.a, self.b, I, self.dt)
+        profiler.lap('integrate')
+        self.t += 1
+        profiler.end_step(self, fired)
+        return fired
+
+    def _record(self, recorder, t, fired):
+        recorder.record(t, fired)
+        if self.profiler is not None:
+            self.profiler.lap('record')
+
+    def run(self, duration, recorder=None):
+        # Returns an int32 (n_spikes, 2) array of [time step, neuron index] rows;
+        # pass a recorder (e.g. a ring buffer) to keep the spikes elsewhere
+        if recorder is None:
+            recorder = SpikeRecorder(self.N, dt=self.dt)
+        self.recorder = recorder
+
+        n_steps = int(round(duration / self.dt))
+        for _ in range(n_steps):
+            t = self.t
+            self._record(recorder, t, self.step())
+        return recorder.firings
+
+    def stream(self, duration=None, chunk_ms=100, record_state=False, state_interval=1):
+        # Yields one dict per chunk_ms of simulated time with 't_start'/'t_end' (steps)
+        # and the chunk's int32 'firings'; with record_state also 'v' and 'u' sampled
+        # every state_interval steps. Memory stays bounded by one chunk, and with
+        # duration=None the generator runs until the caller stops iterating.
+        chunk_steps = max(1, int(round(chunk_ms / self.dt)))
+        end = None if duration is None else self.t + int(round(duration / self.dt))
+        recorder = SpikeRecorder(self.N, chunk_size=max(1024, self.N), dt=self.dt)
+
+        while end is None or self.t < end:
+            recorder.clear()
+            t_start = self.t
+            n_steps = chunk_steps if end is None else min(chunk_steps, end - self.t)
+            states_v = []
+            states_u = []
+            for _ in range(n_steps):
+                if record_state and (self.t - t_start) % state_interval == 0:
+                    states_v.append(self.v.copy())
+                    states_u.append(self.u.copy())
+                t = self.t
+                self._record(recorder, t, self.step())
+
+            chunk = {'t_start': t_start, 't_end': self.t, 'firings': recorder.firings.copy()}
+            if record_state:
+                chunk['v'] = np.array(states_v)
+                chunk['u'] = np.array(states_u)
+            yield chunk
+
+
+def simulate(Ne=800, Ni=200, duration=1000, dt=1.0, seed=None, **kwargs):
+    network = IzhikevichNetwork(Ne, Ni, dt=dt, seed=seed, **kwargs)
+    return network.run(duration)
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description="Run a headless Izhikevich network simulation.")
+    parser.add_argument("--model", default=None,
+                        help="load weights and neuron parameters from a saved model (.npz, directory or .json)")
+    parser.add_argument("--ne", type=int, default=800, help="number of excitatory neurons")
+    parser.add_argument("--ni", type=int, default=200, help="number of inhibitory neurons")
+    parser.add_argument("--duration", type=float, default=1000, help="simulated time in ms")
+    parser.add_argument("--dt", type=float, default=1.0, help="time step in ms")
+    parser.add_argument("--seed", type=int, default=None, help="random seed")
+    parser.add_argument("--connection-probability", type=float, default=None,
+                        help="use sparse random connectivity with this probability instead of all-to-all")
+    parser.add_argument("--excitatory-input", type=float, default=5.0,
+                        help="thalamic noise scale for excitatory neurons")
+    parser.add_argument("--inhibitory-input", type=float, default=2.0,
+                        help="thalamic noise scale for inhibitory neurons")
+    parser.add_argument("--input-file", default=None,
+                        help="replay input currents from a (steps, neurons) .npy file instead of thalamic noise")
+    parser.add_argument("--max-delay", type=int, default=None,
+                        help="random conduction delays of 1..MAX_DELAY steps on excitatory synapses")
+    parser.add_argument("--save-model", default=None,
+                        help="save the network (weights after learning, parameters and delays) to this path")
+    parser.add_argument("--stdp", action='store_true', help="learn the excitatory weights with STDP")
+    parser.add_argument("--snapshot-dir", default=None, help="with --stdp, save the weights to this directory")
+    parser.add_argument("--snapshot-interval", type=int, default=1000, help="steps between weight snapshots")
+    parser.add_argument("--backend", default='numpy', choices=sorted(BACKENDS) + ['auto'],
+                        help="step kernel backend")
+    parser.add_argument("--restore", default=None,
+                        help="continue from a checkpoint of a network built with the same options")
+    parser.add_argument("--checkpoint-dir", default=None, help="write checkpoints to this directory")
+    parser.add_argument("--checkpoint-interval", type=float, default=1000,
+                        help="simulated ms between checkpoints")
+    parser.add_argument("--profile", default=None, help="write per-phase timings and counters to this JSON file")
+    parser.add_argument("--trace", default=None, help="write a Chrome trace (chrome://tracing, Perfetto) of every step")
+    parser.add_argument("--profile-interval", type=int, default=None,
+                        help="print the phase timings of every PROFILE_INTERVAL steps to stderr")
+    parser.add_argument("--output", default=None, help="save firings as a .npy file")
+    parser.add_argument("--chunk-ms", type=float, default=None,
+                        help="stream firings to --output every CHUNK_MS of simulated time instead of "
+                             "keeping them in memory")
+    args = parser.parse_args(argv)
+    if args.max_delay is not None and args.max_delay < 1:
+        parser.error("--max-delay must be at least 1")
+    return args
+
+
+def main(argv=None):
+    args = parse_args(sys.argv[1:] if argv is None else argv)
+
+    network_kwargs = {}
+    input_rng_state = None
+    if args.model:
+        model = load_model(args.model)
+        network_kwargs['synaptic_weights'] = model['synaptic_weights']
+        for name in ('a', 'b', 'c', 'd', 'delays'):
+            network_kwargs[name] = model.get(name)
+        N = as_connectivity(model['synaptic_weights']).N
+        args.ne, args.ni = model['Ne'], model['Ni']
+        if args.ne is None or args.ni is None:
+            # Legacy files carry no population sizes; assume the GUI's 4:1 split
+            args.ne = int(round(0.8 * N))
+            args.ni = N - args.ne
+        if args.seed is None:
+            # The saved seed alone would not do: the model's own draws are skipped on loading
+            args.seed = model['seed']
+            input_rng_state = model.get('input_rng_state')
+
+    if args.input_file:
+        input_generator = ReplayedCurrent(args.input_file, dt=args.dt)
+    else:
+        input_generator = thalamic_input(args.ne, args.ni, args.excitatory_input, args.inhibitory_input, dt=args.dt)
+
+    plasticity = None
+    if args.stdp:
+        plasticity = STDP(snapshot_dir=args.snapshot_dir, snapshot_interval=args.snapshot_interval)
+
+    if args.max_delay is not None:
+        network_kwargs['delays'] = 'random'
+        network_kwargs['max_delay'] = args.max_delay
+
+    profiler = None
+    if args.profile or args.trace or args.profile_interval:
+        profiler = Profiler(interval=args.profile_interval or 1000,
+                            observers=[print_window] if args.profile_interval else [],
+                            trace_events=bool(args.trace))
+
+    network = IzhikevichNetwork(
+        args.ne, args.ni, dt=args.dt, seed=args.seed, connection_probability=args.connection_probability,
+        backend=args.backend, input_generator=input_generator, plasticity=plasticity, profiler=profiler,
+        **network_kwargs
+    )
+    if input_rng_state is not None:
+        set_rng_state(network.rng, input_rng_state)
+    if args.restore:
+        restore_checkpoint(network, args.restore)
+    if args.chunk_ms and args.output:
+        n_spikes = stream_to_sinks(network, args.duration, [NpyAppendSink(args.output)], args.chunk_ms)
+    else:
+        if args.checkpoint_dir:
+            firings = run_with_checkpoints(network, args.duration, args.checkpoint_dir, args.checkpoint_interval)
+        else:
+            firings = network.run(args.duration)
+        n_spikes = len(firings)
+        if args.output:
+            np.save(args.output, firings)
+    if args.save_model:
+        save_model(args.save_model, network.connectivity, network.a, network.b, network.c, network.d,
+                   Ne=args.ne, Ni=args.ni, seed=args.seed, input_rng_state=network.input_rng_state)
+    if profiler is not None:
+        profiler.close_window(network)
+        if args.profile:
+            profiler.to_json(args.profile)
+        if args.trace:
+            profiler.to_chrome_trace(args.trace)
+
+    summary = {
+        'Ne': args.ne,
+        'Ni': args.ni,
+        'duration': args.duration,
+        'dt': args.dt,
+        'seed': args.seed,
+        'spikes': int(n_spikes),
+        'mean_rate_hz': float(n_spikes / (network.N * args.duration / 1000.0)),
+    }
+    json.dump(summary, sys.stdout)
+    sys.stdout.write("\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
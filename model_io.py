@@ -0,0 +1,115 @@
+import os
+import json
+import numpy as np
+from synaptic_connectivity import DelayedConnectivity, DenseConnectivity, SparseConnectivity
+
+# Network models are stored either as a single .npz archive (optionally
+# compressed) or as a directory of .npy files plus metadata.json. The directory
+# layout can be memory-mapped, so large connectomes open without reading the
+# weights into memory. Plain JSON weight lists from older versions still load.
+# Conduction delays are stored next to the weights as a 'delays' array, and
+# izhikevich_simulation adds the generator state its input started from
+# ('input_rng_state'), since the seed alone does not reproduce a loaded run.
+
+FORMAT_VERSION = 1
+PARAMETER_NAMES = ('a', 'b', 'c', 'd')
+METADATA_NAMES = ('Ne', 'Ni', 'seed')
+
+
+def _model_arrays(synaptic_weights, a, b, c, d, extra_arrays):
+    arrays = {}
+    if isinstance(synaptic_weights, DelayedConnectivity):
+        extra_arrays = dict(extra_arrays, delays=synaptic_weights.delays)
+        synaptic_weights = synaptic_weights.connectivity
+    if isinstance(synaptic_weights, SparseConnectivity):
+        arrays['indptr'] = synaptic_weights.indptr
+        arrays['targets'] = synaptic_weights.targets
+        arrays['sparse_weights'] = synaptic_weights.weights
+    else:
+        if isinstance(synaptic_weights, DenseConnectivity):
+            synaptic_weights = synaptic_weights.weights
+        arrays['synaptic_weights'] = np.asarray(synaptic_weights)
+    for name, values in zip(PARAMETER_NAMES, (a, b, c, d)):
+        if values is not None:
+            arrays[name] = np.asarray(values)
+    for name, values in extra_arrays.items():
+        if values is not None:
+            arrays[name] = np.asarray(values)
+    return arrays
+
+
+def save_model(path, synaptic_weights, a=None, b=None, c=None, d=None, Ne=None, Ni=None, seed=None,
+               compress=False, **extra_arrays):
+    # Paths ending in .npz give an archive; anything else a memory-mappable directory
+    arrays = _model_arrays(synaptic_weights, a, b, c, d, extra_arrays)
+    metadata = {'format_version': FORMAT_VERSION, 'Ne': Ne, 'Ni': Ni, 'seed': seed}
+
+    if str(path).endswith('.npz'):
+        for name, value in metadata.items():
+            if value is not None:
+                arrays[name] = np.asarray(value)
+        if compress:
+            np.savez_compressed(path, **arrays)
+        else:
+            np.savez(path, **arrays)
+        return
+
+    os.makedirs(path, exist_ok=True)
+    for name, values in arrays.items():
+        np.save(os.path.join(path, name + '.npy'), values)
+    with open(os.path.join(path, 'metadata.json'), 'w') as file:
+        json.dump(metadata, file)
+
+
+def _build_model(arrays, metadata):
+    model = dict(arrays)
+    if 'indptr' in model:
+        indptr = model.pop('indptr')
+        model['synaptic_weights'] = SparseConnectivity(len(indptr) - 1, indptr, model.pop('targets'),
+                                                       model.pop('sparse_weights'))
+    for name in METADATA_NAMES:
+        model[name] = metadata.get(name)
+    return model
+
+
+def load_model(path, mmap_mode='c'):
+    # Returns a dict with 'synaptic_weights' (array or SparseConnectivity), the
+    # neuron parameters a/b/c/d, Ne, Ni, seed and any extra arrays that were saved
+    # (such as 'delays', which IzhikevichNetwork accepts as is).
+    # Directory models are memory-mapped with mmap_mode (None reads them fully;
+    # the default copy-on-write mode keeps them editable without touching the file).
+    path = str(path)
+    if path.endswith('.json'):
+        return load_json_weights(path)
+
+    if os.path.isdir(path):
+        with open(os.path.join(path, 'metadata.json'), 'r') as file:
+            metadata = json.load(file)
+        arrays = {}
+        for file_name in os.listdir(path):
+            if file_name.endswith('.npy'):
+                arrays[file_name[:-4]] = np.load(os.path.join(path, file_name), mmap_mode=mmap_mode)
+        return _build_model(arrays, metadata)
+
+    with np.load(path) as archive:
+        arrays = {name: archive[name] for name in archive.files}
+    metadata = {}
+    for name in METADATA_NAMES + ('format_version',):
+        if name in arrays:
+            metadata[name] = arrays.pop(name).item()
+    return _build_model(arrays, metadata)
+
+
+def load_json_weights(path):
+    # Legacy format: the weight matrix as nested JSON lists, without parameters
+    with open(path, 'r') as file:
+        data = json.load(file)
+    model = {'synaptic_weights': np.array(data)}
+    for name in METADATA_NAMES:
+        model[name] = None
+    return model
+
+
+def save_json_weights(path, synaptic_weights):
+    with open(path, 'w') as file:
+        json.dump(np.asarray(synaptic_weights).tolist(), file)
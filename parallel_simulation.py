@@ -0,0 +1,156 @@
+import os
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+import numpy as np
+from izhikevich_backends import get_backend
+from izhikevich_simulation import IzhikevichNetwork, rng_state, set_rng_state, thalamic_input
+
+
+class ParallelIzhikevichNetwork(IzhikevichNetwork):
+    # Splits the neurons into contiguous partitions advanced by a thread pool.
+    # v, u and the spike flags are single shared arrays; each worker owns a slice
+    # of them plus the synapses onto its neurons, and spikes are exchanged once
+    # per dt through the flags. NumPy ufuncs and the Numba kernels release the
+    # GIL, so partitions run concurrently.
+    #
+    # Input drives that support partition() (see input_drives, including the
+    # default thalamic noise) are split so that each partition draws its input
+    # from its own generator spawned from the seed. Results are reproducible for
+    # a given seed and n_workers, but differ from the serial IzhikevichNetwork.
+    # Other input generators are called once per step on the whole network.
+    def __init__(self, Ne=800, Ni=200, *args, n_workers=None, excitatory_scale=5.0, inhibitory_scale=2.0, **kwargs):
+        if kwargs.get('plasticity') is not None:
+            raise ValueError("Plasticity is not supported by ParallelIzhikevichNetwork")
+        self.excitatory_scale = excitatory_scale
+        self.inhibitory_scale = inhibitory_scale
+        super().__init__(Ne, Ni, *args, **kwargs)
+
+        self.n_workers = n_workers or os.cpu_count()
+        bounds = np.linspace(0, self.N, self.n_workers + 1).astype(int)
+        self.partitions = list(zip(bounds[:-1], bounds[1:]))
+        self.local_connectivity = [self.connectivity.restrict_targets(lo, hi) for lo, hi in self.partitions]
+        self.worker_backends = [get_backend(self.backend.name) for _ in self.partitions]
+        seeds = np.random.SeedSequence(self.seed).spawn(self.n_workers)
+        self.worker_rngs = [np.random.default_rng(s) for s in seeds]
+        try:
+            self.worker_inputs = [self.input_generator.partition(lo, hi) for lo, hi in self.partitions]
+            self.partitioned_input = True
+        except (AttributeError, NotImplementedError):
+            self.worker_inputs = None
+            self.partitioned_input = False
+
+        self.spiked = np.zeros(self.N, dtype=bool)
+        self.executor = ThreadPoolExecutor(self.n_workers)
+        self._fired = None
+
+    def default_input(self):
+        return thalamic_input(self.Ne, self.Ni, self.excitatory_scale, self.inhibitory_scale, dt=self.dt)
+
+    def reset(self):
+        super().reset()
+        for worker_input in getattr(self, 'worker_inputs', None) or []:
+            worker_input.reset()
+        for connectivity in getattr(self, 'local_connectivity', []):
+            if hasattr(connectivity, 'reset'):
+                connectivity.reset()
+        self._fired = None
+
+    def _stateful_parts(self):
+        parts = [] if self.partitioned_input else [('input', self.input_generator)]
+        if self.partitioned_input:
+            parts += [(f"input/{k}", worker_input) for k, worker_input in enumerate(self.worker_inputs)]
+        parts += [(f"connectivity/{k}", connectivity) for k, connectivity in enumerate(self.local_connectivity)]
+        return [(prefix, part) for prefix, part in parts if hasattr(part, 'get_state')]
+
+    def get_state(self):
+        state = super().get_state()
+        for k, rng in enumerate(self.worker_rngs):
+            state[f"worker_rng/{k}"] = rng_state(rng)
+        state['spiked'] = self.spiked.copy()
+        if self._fired is not None:
+            state['fired'] = self._fired.copy()
+        return state
+
+    def set_state(self, state):
+        if f"worker_rng/{self.n_workers - 1}" not in state or f"worker_rng/{self.n_workers}" in state:
+            raise ValueError(f"State does not come from a network with {self.n_workers} workers")
+        super().set_state(state)
+        for k, rng in enumerate(self.worker_rngs):
+            set_rng_state(rng, state[f"worker_rng/{k}"])
+        self.spiked[:] = state['spiked']
+        self._fired = np.array(state['fired']) if 'fired' in state else None
+
+    def close(self):
+        self.executor.shutdown()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _fire_partition(self, k):
+        lo, hi = self.partitions[k]
+        local = self.worker_backends[k].fire(self.v[lo:hi], self.u[lo:hi], self.c[lo:hi], self.d[lo:hi])
+        self.spiked[lo:hi] = False
+        self.spiked[lo + local] = True
+
+    def _advance_partition(self, k, fired, I):
+        lo, hi = self.partitions[k]
+        if I is None:
+            I = self.worker_inputs[k](self.t, self.worker_rngs[k])
+        else:
+            I = I[lo:hi].copy()
+        I_syn = self.local_connectivity[k].propagate(fired)
+        if self.dt != 1.0:
+            I_syn /= self.dt
+        I += I_syn
+        self.worker_backends[k].integrate(self.v[lo:hi], self.u[lo:hi], self.a[lo:hi], self.b[lo:hi], I, self.dt)
+
+        # Detect the spikes of the next step while the partition is still hot
+        self._fire_partition(k)
+
+    def step(self):
+        # With a profiler the workers are timed as one 'workers' phase, since
+        # input, propagation and integration overlap across partitions
+        profiler = self.profiler
+        if profiler is not None:
+            profiler.begin()
+        if self._fired is None:
+            list(self.executor.map(self._fire_partition, range(self.n_workers)))
+        fired = np.flatnonzero(self.spiked)
+        if profiler is not None:
+            profiler.lap('fire')
+
+        I = None
+        if not self.partitioned_input:
+            I = self.input_generator(self.t, self.rng)
+            if profiler is not None:
+                profiler.lap('input')
+        list(self.executor.map(lambda k: self._advance_partition(k, fired, I), range(self.n_workers)))
+        self._fired = fired
+        self.t += 1
+        if profiler is not None:
+            profiler.lap('workers')
+            profiler.end_step(self, fired)
+        return fired
+
+
+def _run_trial(network_kwargs, duration):
+    network = IzhikevichNetwork(**network_kwargs)
+    return network.run(duration)
+
+
+def run_trials(parameter_sets, duration=1000, seed=None, n_workers=None):
+    # Runs independent networks in a process pool, one per dict of
+    # IzhikevichNetwork keyword arguments. Each run gets its own RNG stream
+    # spawned from `seed`, so results do not depend on scheduling or n_workers.
+    parameter_sets = list(parameter_sets)
+    seeds = np.random.SeedSequence(seed).spawn(len(parameter_sets))
+    jobs = [dict(kwargs, seed=kwargs.get('seed', s)) for kwargs, s in zip(parameter_sets, seeds)]
+
+    with ProcessPoolExecutor(n_workers) as executor:
+        return list(executor.map(_run_trial, jobs, [duration] * len(jobs)))
+
+
+def run_repeated_trials(n_trials, duration=1000, seed=None, n_workers=None, **network_kwargs):
+    return run_trials([network_kwargs] * n_trials, duration=duration, seed=seed, n_workers=n_workers)
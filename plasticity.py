@@ -0,0 +1,138 @@
+import os
+import numpy as np
+from synaptic_connectivity import SparseConnectivity
+
+# Pair-based spike-timing-dependent plasticity with exponential eligibility
+# traces. Every neuron keeps a presynaptic trace x (time constant tau_plus) and
+# a postsynaptic trace y (tau_minus), both incremented by 1 per spike. When
+# neuron j fires, its outgoing synapses are depressed by A_minus * y[post]; when
+# neuron i fires, its incoming synapses are potentiated by A_plus * x[pre]. Only
+# the columns and rows of the neurons that fired are touched, so a step costs
+# O(spikes * N) for dense and O(synapses of the fired neurons) for sparse
+# weights instead of O(N^2). Spikes in the same step do not pair with each other.
+#
+# Only synapses from the first n_plastic neurons (the excitatory population,
+# by default) learn, and their weights are clipped to [w_min, w_max]. Dense
+# weights treat every pair except self-connections as a synapse; use a
+# SparseConnectivity to keep absent synapses absent.
+
+
+class STDP:
+    def __init__(self, A_plus=0.1, A_minus=0.12, tau_plus=20.0, tau_minus=20.0, w_min=0.0, w_max=10.0,
+                 n_plastic=None, snapshot_dir=None, snapshot_interval=1000):
+        self.A_plus = A_plus
+        self.A_minus = A_minus
+        self.tau_plus = tau_plus
+        self.tau_minus = tau_minus
+        self.w_min = w_min
+        self.w_max = w_max
+        self.n_plastic = n_plastic
+        self.snapshot_dir = snapshot_dir
+        self.snapshot_interval = snapshot_interval
+        self.connectivity = None
+
+    def attach(self, connectivity, Ne, dt=1.0):
+        # Binds the rule to the connectivity it modifies in place (done by
+        # IzhikevichNetwork); n_plastic defaults to the Ne excitatory neurons.
+        # With conduction delays the weights of the wrapped connectivity learn
+        # from spike times at the soma, not at arrival.
+        self.connectivity = getattr(connectivity, 'connectivity', connectivity)
+        self.N = self.connectivity.N
+        self.dt = dt
+        if self.n_plastic is None:
+            self.n_plastic = Ne
+        self.decay_plus = np.exp(-dt / self.tau_plus)
+        self.decay_minus = np.exp(-dt / self.tau_minus)
+        self.t = 0
+        if self.snapshot_dir is not None:
+            os.makedirs(self.snapshot_dir, exist_ok=True)
+        self.reset()
+
+    def reset(self):
+        # Clears the traces; the learned weights are kept
+        self.x_pre = np.zeros(self.N)
+        self.y_post = np.zeros(self.N)
+
+    def get_state(self):
+        # Traces, step count and the learned weights
+        return {'x_pre': self.x_pre.copy(), 'y_post': self.y_post.copy(), 't': np.array(self.t),
+                'weights': np.array(self.connectivity.weights)}
+
+    def set_state(self, state):
+        self.x_pre = np.array(state['x_pre'], dtype=np.float64)
+        self.y_post = np.array(state['y_post'], dtype=np.float64)
+        self.t = int(state['t'])
+        self.connectivity.weights[...] = state['weights']
+
+    def update(self, fired):
+        self.x_pre *= self.decay_plus
+        self.y_post *= self.decay_minus
+
+        if len(fired):
+            fired = np.asarray(fired)
+            pre = fired[fired < self.n_plastic]
+            if isinstance(self.connectivity, SparseConnectivity):
+                self._update_sparse(pre, fired)
+            else:
+                self._update_dense(pre, fired)
+            self.x_pre[fired] += 1
+            self.y_post[fired] += 1
+
+        self.t += 1
+        if self.snapshot_dir is not None and self.t % self.snapshot_interval == 0:
+            self.snapshot()
+
+    def _update_dense(self, pre, post):
+        W = self.connectivity.weights
+        n = self.n_plastic
+        if len(pre):
+            # Depression of the outgoing synapses (columns) of presynaptic spikes
+            W[:, pre] = np.clip(W[:, pre] - self.A_minus * self.y_post[:, np.newaxis], self.w_min, self.w_max)
+            W[pre, pre] = 0
+        # Potentiation of the plastic incoming synapses (rows) of postsynaptic spikes
+        W[post, :n] = np.clip(W[post, :n] + self.A_plus * self.x_pre[:n], self.w_min, self.w_max)
+        own = post[post < n]
+        W[own, own] = 0
+
+    def _update_sparse(self, pre, post):
+        connectivity = self.connectivity
+        weights = connectivity.weights
+        if len(pre):
+            synapses = connectivity.synapse_indices(pre)
+            weights[synapses] = np.clip(weights[synapses] - self.A_minus * self.y_post[connectivity.targets[synapses]],
+                                        self.w_min, self.w_max)
+        synapses, sources = connectivity.incoming_synapses(post)
+        plastic = sources < self.n_plastic
+        synapses = synapses[plastic]
+        weights[synapses] = np.clip(weights[synapses] + self.A_plus * self.x_pre[sources[plastic]],
+                                    self.w_min, self.w_max)
+
+    def snapshot(self):
+        # Writes the current weights to snapshot_dir/weights_<step>.npy; sparse
+        # layouts also get indptr.npy and targets.npy, written once
+        weights = self.connectivity.weights
+        if isinstance(self.connectivity, SparseConnectivity):
+            structure = os.path.join(self.snapshot_dir, 'indptr.npy')
+            if not os.path.exists(structure):
+                np.save(structure, self.connectivity.indptr)
+                np.save(os.path.join(self.snapshot_dir, 'targets.npy'), self.connectivity.targets)
+        path = os.path.join(self.snapshot_dir, f"weights_{self.t:09d}.npy")
+        np.save(path, weights)
+        return path
+
+
+def snapshot_steps(snapshot_dir):
+    # Steps with a saved snapshot, in order
+    return sorted(int(name[8:-4]) for name in os.listdir(snapshot_dir)
+                  if name.startswith('weights_') and name.endswith('.npy'))
+
+
+def load_snapshot(snapshot_dir, step, mmap_mode=None):
+    # The weights saved at `step`, as a dense array or a SparseConnectivity
+    weights = np.load(os.path.join(snapshot_dir, f"weights_{step:09d}.npy"), mmap_mode=mmap_mode)
+    indptr_path = os.path.join(snapshot_dir, 'indptr.npy')
+    if weights.ndim == 2 or not os.path.exists(indptr_path):
+        return weights
+    indptr = np.load(indptr_path)
+    targets = np.load(os.path.join(snapshot_dir, 'targets.npy'), mmap_mode=mmap_mode)
+    return SparseConnectivity(len(indptr) - 1, indptr, targets, weights)
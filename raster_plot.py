@@ -0,0 +1,101 @@
+import numpy as np
+from spike_analysis import RasterPyramid
+
+
+class RasterPlot:
+    # Spike raster on an existing matplotlib axis that reuses its artists instead
+    # of clearing the axis. Up to max_points spikes are drawn as a scatter via
+    # set_offsets; larger rasters are binned into a RasterPyramid and shown as an
+    # image of roughly one bin per pixel, which is re-cut from the pyramid when the
+    # view is zoomed or panned. append() blits only the newly streamed spikes.
+    def __init__(self, ax, N, duration, max_points=50000, title='Neuron Firings'):
+        self.ax = ax
+        self.canvas = ax.figure.canvas
+        self.N = N
+        self.duration = duration
+        self.max_points = max_points
+
+        self.scatter = ax.scatter([], [], s=1)
+        self.stream_scatter = ax.scatter([], [], s=1, color=self.scatter.get_facecolor(), animated=True)
+        self.image = ax.imshow(np.zeros((1, 1)), extent=(0, duration, 0, N), origin='lower', aspect='auto',
+                               interpolation='nearest', cmap='Greys', visible=False)
+        ax.set_xlim([0, duration])
+        ax.set_ylim([0, N])
+        ax.set_xlabel('Time (ms)')
+        ax.set_ylabel('Neuron Index')
+        ax.set_title(title)
+
+        self.firings = np.empty((0, 2), dtype=np.int32)
+        self.pyramid = None
+        self._background = None
+        self._streamed = []
+        self.canvas.mpl_connect('draw_event', self._on_draw)
+        ax.callbacks.connect('xlim_changed', self._on_limits)
+        ax.callbacks.connect('ylim_changed', self._on_limits)
+
+    def set_size(self, N, duration=None):
+        self.N = N
+        if duration is not None:
+            self.duration = duration
+        self.ax.set_xlim([0, self.duration])
+        self.ax.set_ylim([0, self.N])
+        self.image.set_extent((0, self.duration, 0, self.N))
+
+    def _on_draw(self, event):
+        self._background = None
+
+    def _on_limits(self, ax):
+        if self.pyramid is not None and self.image.get_visible():
+            self._show_pyramid()
+
+    def _show_pyramid(self):
+        # Per axis, the pyramid level that gives about one bin per pixel of the visible area
+        (x0, x1), (y0, y1) = sorted(self.ax.get_xlim()), sorted(self.ax.get_ylim())
+        counts, extent = self.pyramid.window(int(np.floor(x0)), int(np.ceil(x1)), int(np.floor(y0)),
+                                             int(np.ceil(y1)), max(1, int(self.ax.bbox.width)),
+                                             max(1, int(self.ax.bbox.height)))
+        self.image.set_data(counts)
+        self.image.set_extent(extent)
+        self.image.set_clim(0, max(1, counts.max()) if counts.size else 1)
+
+    def set_firings(self, firings, draw=True):
+        # Replace the whole raster
+        self.firings = np.asarray(firings)
+        self._streamed = []
+        self.pyramid = None
+        if len(self.firings) <= self.max_points:
+            self.scatter.set_offsets(self.firings if len(self.firings) else np.empty((0, 2)))
+            self.scatter.set_visible(True)
+            self.image.set_visible(False)
+        else:
+            # Base bins small enough for any zoom, bounded to about 2048 x 2048
+            self.pyramid = RasterPyramid(self.N, bin_steps=max(1, int(self.duration) // 2048),
+                                         neuron_bin=max(1, self.N // 2048))
+            self.pyramid.add(self.firings, t_end=int(self.duration))
+            self._show_pyramid()
+            self.image.set_visible(True)
+            self.scatter.set_visible(False)
+            self.scatter.set_offsets(np.empty((0, 2)))
+        if draw:
+            self.canvas.draw()
+
+    def append(self, firings):
+        # Draw newly streamed spikes on top of the current frame without a full redraw
+        firings = np.asarray(firings)
+        if len(firings) == 0:
+            return
+        self._streamed.append(firings)
+        if self._background is None:
+            self.canvas.draw()
+            self._background = self.canvas.copy_from_bbox(self.ax.bbox)
+        self.canvas.restore_region(self._background)
+        self.stream_scatter.set_offsets(firings)
+        self.ax.draw_artist(self.stream_scatter)
+        self.canvas.blit(self.ax.bbox)
+        # The new points are now part of the saved background
+        self._background = self.canvas.copy_from_bbox(self.ax.bbox)
+
+    def flush(self):
+        # Fold the streamed spikes into the persistent artists with one full redraw
+        if self._streamed:
+            self.set_firings(np.concatenate([self.firings] + self._streamed))
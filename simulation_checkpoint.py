@@ -0,0 +1,68 @@
+import os
+import numpy as np
+from spike_recorder import SpikeRecorder
+
+# Checkpoints of a running network. A checkpoint holds network.get_state(): v,
+# u, the step index, the generator state, buffered input noise, pending delayed
+# input and plasticity traces and weights. It does not hold the model itself.
+# Restoring into a network built with the same arguments (or from the same saved
+# model) continues bit-identically, so a network can be warmed up past its
+# transient once and many experiments forked from that state:
+#
+#   network = IzhikevichNetwork(seed=1)
+#   network.run(500)
+#   save_checkpoint('warm.npz', network)
+#   ...
+#   fork = IzhikevichNetwork(seed=1, input_generator=...)
+#   restore_checkpoint(fork, 'warm.npz')
+#
+# Checkpoints are uncompressed .npz archives unless compress=True.
+
+FORMAT_VERSION = 1
+
+
+def save_checkpoint(path, network, compress=False):
+    state = network.get_state()
+    state['format_version'] = np.array(FORMAT_VERSION)
+    (np.savez_compressed if compress else np.savez)(path, **state)
+    return path
+
+
+def load_checkpoint(path):
+    with np.load(path) as archive:
+        state = {name: archive[name] for name in archive.files}
+    version = int(state.pop('format_version', FORMAT_VERSION))
+    if version > FORMAT_VERSION:
+        raise ValueError(f"Checkpoint format {version} is newer than supported ({FORMAT_VERSION})")
+    return state
+
+
+def restore_checkpoint(network, path):
+    network.set_state(load_checkpoint(path))
+    return network
+
+
+def checkpoint_path(directory, t):
+    return os.path.join(directory, f"checkpoint_{t:09d}.npz")
+
+
+def checkpoint_steps(directory):
+    # Steps with a saved checkpoint, in order
+    return sorted(int(name[11:-4]) for name in os.listdir(directory)
+                  if name.startswith('checkpoint_') and name.endswith('.npz'))
+
+
+def run_with_checkpoints(network, duration, directory, interval_ms, recorder=None, compress=False):
+    # network.run that also writes directory/checkpoint_<step>.npz every
+    # interval_ms of simulated time; returns the firings like run()
+    os.makedirs(directory, exist_ok=True)
+    if recorder is None:
+        recorder = SpikeRecorder(network.N, dt=network.dt)
+    interval = max(1, int(round(interval_ms / network.dt)))
+    end = network.t + int(round(duration / network.dt))
+    while network.t < end:
+        n_steps = min(interval - network.t % interval, end - network.t)
+        network.run(n_steps * network.dt, recorder)
+        if network.t % interval == 0:
+            save_checkpoint(checkpoint_path(directory, network.t), network, compress)
+    return recorder.firings
@@ -0,0 +1,170 @@
+import sys
+import json
+import time
+import tracemalloc
+from contextlib import contextmanager
+import numpy as np
+
+# Opt-in instrumentation of the simulation loop. A Profiler passed to
+# IzhikevichNetwork(profiler=...) times every phase of a step and counts spikes
+# and the synapses they touch; without one the network runs its plain step, so
+# leaving the hooks in costs a single attribute test per step.
+#
+#   input       input_generator (RNG draws, replayed currents)
+#   fire        threshold test and reset
+#   propagate   synaptic input of the spikes, including delay bookkeeping
+#   plasticity  weight updates, when a rule is attached
+#   integrate   membrane update
+#   record      spike bookkeeping in run()
+#
+# Other code can time its own sections (plotting, saving) with
+# profiler.measure(name). Every `interval` steps the observers are called as
+# observer(profiler, network) with the finished window in profiler.window;
+# trace_events keeps one event per phase and step for to_chrome_trace, and
+# trace_allocations reports the peak memory allocated per window (tracemalloc
+# slows NumPy code down noticeably, so it is off by default).
+
+PHASES = ('input', 'fire', 'propagate', 'plasticity', 'integrate', 'record')
+
+
+def synapses_touched(connectivity, fired):
+    # Synapses read when the neurons in `fired` spike
+    connectivity = getattr(connectivity, 'connectivity', connectivity)
+    indptr = getattr(connectivity, 'indptr', None)
+    if indptr is None:
+        return len(fired) * connectivity.N
+    return int(np.sum(indptr[fired + 1] - indptr[fired]))
+
+
+class Profiler:
+    def __init__(self, interval=1000, observers=(), trace_events=False, trace_allocations=False,
+                 max_events=1000000):
+        self.interval = interval
+        self.observers = list(observers)
+        self.trace_events = trace_events
+        self.trace_allocations = trace_allocations
+        self.max_events = max_events
+        self.clock = time.perf_counter_ns
+        self.reset()
+
+    def reset(self):
+        self.totals = dict.fromkeys(PHASES, 0)   # ns per phase
+        self.steps = 0
+        self.spikes = 0
+        self.synapses = 0
+        self.max_spikes_per_step = 0
+        self.windows = []
+        self.events = []
+        self.counter_events = []
+        self.origin = self.clock()
+        self._window_start = self._snapshot()
+        self._last = self.origin
+        if self.trace_allocations and not tracemalloc.is_tracing():
+            tracemalloc.start()
+        if self.trace_allocations:
+            tracemalloc.reset_peak()
+
+    def _snapshot(self):
+        return {'totals': dict(self.totals), 'steps': self.steps, 'spikes': self.spikes,
+                'synapses': self.synapses, 'time': self.clock()}
+
+    def begin(self):
+        self._last = self.clock()
+
+    def lap(self, phase):
+        # Charges the time since the previous mark to `phase`
+        now = self.clock()
+        self.totals[phase] = self.totals.get(phase, 0) + now - self._last
+        if self.trace_events and len(self.events) < self.max_events:
+            self.events.append((phase, self._last, now - self._last))
+        self._last = now
+
+    @contextmanager
+    def measure(self, phase):
+        start = self.clock()
+        try:
+            yield
+        finally:
+            now = self.clock()
+            self.totals[phase] = self.totals.get(phase, 0) + now - start
+            if self.trace_events and len(self.events) < self.max_events:
+                self.events.append((phase, start, now - start))
+
+    def end_step(self, network, fired):
+        n_spikes = len(fired)
+        self.steps += 1
+        self.spikes += n_spikes
+        self.synapses += synapses_touched(network.connectivity, fired)
+        if n_spikes > self.max_spikes_per_step:
+            self.max_spikes_per_step = n_spikes
+        if self.steps % self.interval == 0:
+            self.close_window(network)
+        self._last = self.clock()
+
+    def close_window(self, network=None):
+        start = self._window_start
+        end = self._snapshot()
+        steps = end['steps'] - start['steps']
+        if steps == 0:
+            return None
+        window = {
+            'first_step': start['steps'],
+            'steps': steps,
+            'wall_s': (end['time'] - start['time']) * 1e-9,
+            'phases_s': {phase: (end['totals'][phase] - start['totals'].get(phase, 0)) * 1e-9
+                         for phase in end['totals']},
+            'spikes_per_step': (end['spikes'] - start['spikes']) / steps,
+            'synapses_per_step': (end['synapses'] - start['synapses']) / steps,
+        }
+        if self.trace_allocations:
+            current, peak = tracemalloc.get_traced_memory()
+            window['alloc_current_mb'] = current / 2**20
+            window['alloc_peak_mb'] = peak / 2**20
+            tracemalloc.reset_peak()
+        self.windows.append(window)
+        self.counter_events.append((end['time'], window['spikes_per_step'], window['synapses_per_step']))
+        self.window = window
+        self._window_start = end
+        for observer in self.observers:
+            observer(self, network)
+        return window
+
+    def summary(self):
+        steps = max(self.steps, 1)
+        total = sum(self.totals.values())
+        return {
+            'steps': self.steps,
+            'spikes': self.spikes,
+            'synapses_touched': self.synapses,
+            'spikes_per_step': self.spikes / steps,
+            'max_spikes_per_step': self.max_spikes_per_step,
+            'synapses_per_step': self.synapses / steps,
+            'phases_s': {phase: ns * 1e-9 for phase, ns in self.totals.items()},
+            'phase_fraction': {phase: ns / total if total else 0.0 for phase, ns in self.totals.items()},
+            'us_per_step': total * 1e-3 / steps,
+            'windows': self.windows,
+        }
+
+    def to_json(self, path):
+        with open(path, 'w') as file:
+            json.dump(self.summary(), file, indent=2)
+
+    def to_chrome_trace(self, path):
+        # Trace Event Format, viewable in chrome://tracing or Perfetto: one
+        # complete event per traced phase and counters per window
+        events = [{'name': phase, 'ph': 'X', 'pid': 0, 'tid': 0, 'ts': (start - self.origin) / 1000,
+                   'dur': duration / 1000} for phase, start, duration in self.events]
+        events += [{'name': 'activity', 'ph': 'C', 'pid': 0, 'ts': (time_ns - self.origin) / 1000,
+                    'args': {'spikes_per_step': spikes, 'synapses_per_step': synapses}}
+                   for time_ns, spikes, synapses in self.counter_events]
+        with open(path, 'w') as file:
+            json.dump({'traceEvents': events, 'displayTimeUnit': 'ms'}, file)
+
+
+def print_window(profiler, network, file=None):
+    # Observer that writes one line per window to stderr
+    window = profiler.window
+    phases = ' '.join(f"{phase}={1e6 * seconds / window['steps']:.0f}us"
+                      for phase, seconds in window['phases_s'].items() if seconds)
+    print(f"steps {window['first_step']}-{window['first_step'] + window['steps']}: "
+          f"{window['spikes_per_step']:.1f} spikes/step, {phases}", file=file or sys.stderr)
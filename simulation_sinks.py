@@ -0,0 +1,134 @@
+import os
+import struct
+import contextlib
+import numpy as np
+
+try:
+    import h5py
+except ImportError:  # HDF5 output is optional
+    h5py = None
+
+# Sinks consume the chunks yielded by IzhikevichNetwork.stream and write them to
+# disk as they arrive. Every sink has write(chunk) and close(), and works as a
+# context manager.
+
+_NPY_HEADER_SIZE = 128
+
+
+def _npy_header(shape, dtype):
+    # Fixed-size .npy (version 1.0) header, so the shape can be rewritten in place
+    header = repr({'descr': np.lib.format.dtype_to_descr(np.dtype(dtype)),
+                   'fortran_order': False, 'shape': tuple(shape)})
+    header = header.ljust(_NPY_HEADER_SIZE - 10 - 1) + '\n'
+    return b'\x93NUMPY\x01\x00' + struct.pack('<H', len(header)) + header.encode('latin1')
+
+
+class _Sink:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        pass
+
+
+class NpyAppendSink(_Sink):
+    # Appends rows to a single .npy file whose header is updated on close, so the
+    # result loads (or memory-maps) with np.load like any other array. Spikes go
+    # to `path`; with record_state, v and u go to <path>_v.npy and <path>_u.npy.
+    def __init__(self, path, record_state=False):
+        base = path[:-4] if path.endswith('.npy') else path
+        self.files = {'firings': self._open(base + '.npy', (0, 2), np.int32)}
+        if record_state:
+            self.files['v'] = None
+            self.files['u'] = None
+            self._state_paths = {'v': base + '_v.npy', 'u': base + '_u.npy'}
+
+    def _open(self, path, shape, dtype):
+        file = open(path, 'wb')
+        file.write(_npy_header(shape, dtype))
+        return [file, list(shape), np.dtype(dtype)]
+
+    def _append(self, name, rows):
+        if self.files[name] is None:
+            self.files[name] = self._open(self._state_paths[name], (0,) + rows.shape[1:], rows.dtype)
+        file, shape, dtype = self.files[name]
+        file.write(np.ascontiguousarray(rows, dtype=dtype).tobytes())
+        shape[0] += len(rows)
+
+    def write(self, chunk):
+        self._append('firings', chunk['firings'])
+        for name in ('v', 'u'):
+            if name in self.files and name in chunk:
+                self._append(name, chunk[name])
+
+    def close(self):
+        for entry in self.files.values():
+            if entry is None or entry[0].closed:
+                continue
+            file, shape, dtype = entry
+            file.seek(0)
+            file.write(_npy_header(shape, dtype))
+            file.close()
+
+
+class NpyChunkSink(_Sink):
+    # Writes every chunk to its own spikes_<n>.npy (and v_<n>.npy / u_<n>.npy)
+    # file in a directory, with chunk boundaries listed in chunks.npy on close
+    def __init__(self, directory):
+        self.directory = directory
+        self.index = []
+        os.makedirs(directory, exist_ok=True)
+
+    def write(self, chunk):
+        n = len(self.index)
+        np.save(os.path.join(self.directory, f"spikes_{n:06d}.npy"), chunk['firings'])
+        for name in ('v', 'u'):
+            if name in chunk:
+                np.save(os.path.join(self.directory, f"{name}_{n:06d}.npy"), chunk[name])
+        self.index.append((chunk['t_start'], chunk['t_end'], len(chunk['firings'])))
+
+    def close(self):
+        np.save(os.path.join(self.directory, 'chunks.npy'), np.array(self.index, dtype=np.int64).reshape(-1, 3))
+
+
+class HDF5Sink(_Sink):
+    # Appends to resizable 'firings' (and 'v'/'u') datasets of an HDF5 file
+    def __init__(self, path, compression='gzip'):
+        if h5py is None:
+            raise ImportError("HDF5Sink requires the h5py package")
+        self.file = h5py.File(path, 'w')
+        self.compression = compression
+
+    def _append(self, name, rows):
+        if name not in self.file:
+            self.file.create_dataset(name, shape=(0,) + rows.shape[1:], maxshape=(None,) + rows.shape[1:],
+                                     dtype=rows.dtype, chunks=True, compression=self.compression)
+        dataset = self.file[name]
+        dataset.resize(dataset.shape[0] + len(rows), axis=0)
+        dataset[-len(rows):] = rows
+
+    def write(self, chunk):
+        for name in ('firings', 'v', 'u'):
+            if name in chunk and len(chunk[name]):
+                self._append(name, chunk[name])
+
+    def close(self):
+        self.file.close()
+
+
+def stream_to_sinks(network, duration, sinks, chunk_ms=100, record_state=False, state_interval=1):
+    # Drives network.stream into every sink and returns the number of spikes
+    # written. The sinks are closed even if the run fails, so what was written
+    # so far stays readable (e.g. the .npy header matches the rows on disk).
+    spikes = 0
+    with contextlib.ExitStack() as stack:
+        for sink in sinks:
+            stack.callback(sink.close)
+        for chunk in network.stream(duration, chunk_ms, record_state, state_interval):
+            for sink in sinks:
+                sink.write(chunk)
+            spikes += len(chunk['firings'])
+    return spikes
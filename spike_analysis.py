@@ -0,0 +1,265 @@
+import numpy as np
+
+# Population statistics computed from compact int32 (n_spikes, 2) arrays of
+# [time step, neuron index] rows, as returned by run() or written by the sinks.
+# SpikeStatistics and RasterPyramid accept the spikes in chunks (stream()
+# chunks, or iter_chunks over a memory-mapped .npy), so memory grows with the
+# number of neurons and time bins, never with the number of spikes. Chunks for
+# SpikeStatistics must arrive in time order.
+
+
+def iter_chunks(firings, chunk_size=1000000):
+    # Slices of a (possibly memory-mapped) firings array, chunk_size rows at a time
+    for start in range(0, len(firings), chunk_size):
+        yield np.asarray(firings[start:start + chunk_size])
+
+
+def _grow(counts, length):
+    # counts with at least `length` rows, doubling the capacity when needed
+    if length <= len(counts):
+        return counts
+    grown = np.zeros((max(length, 2 * len(counts)),) + counts.shape[1:], dtype=counts.dtype)
+    grown[:len(counts)] = counts
+    return grown
+
+
+class SpikeStatistics:
+    # Streaming accumulator of
+    #   population rate   spikes per bin_ms bin, for the excitatory (first Ne)
+    #                     and inhibitory neurons separately
+    #   per-neuron rates  spike counts over the observed span
+    #   ISI statistics    per-neuron mean, CV and an E/I-split histogram over
+    #                     isi_edges (ms), with longer intervals in the last bin
+    def __init__(self, N, Ne=None, dt=1.0, bin_ms=1.0, isi_edges=None, t_start=0):
+        self.N = N
+        self.Ne = N if Ne is None else Ne
+        self.dt = dt
+        self.bin_steps = max(1, int(round(bin_ms / dt)))
+        self.bin_ms = self.bin_steps * dt
+        self.isi_edges = np.arange(0.0, 501.0, 5.0) if isi_edges is None else np.asarray(isi_edges, dtype=np.float64)
+        self.t_start = t_start
+        self.t_end = t_start
+
+        self.spike_counts = np.zeros(N, dtype=np.int64)
+        self.population_counts = np.zeros((1024, 2), dtype=np.int64)   # (bins, [E, I])
+        self.isi_counts = np.zeros((2, len(self.isi_edges) - 1), dtype=np.int64)
+        self.isi_sum = np.zeros(N)
+        self.isi_sum_squares = np.zeros(N)
+        self.isi_n = np.zeros(N, dtype=np.int64)
+        self.last_spike = np.full(N, -1, dtype=np.int64)
+
+    def add(self, firings, t_end=None):
+        # t_end (exclusive, in steps) extends the observed span past the last spike,
+        # e.g. chunk['t_end'] of a stream() chunk
+        firings = np.asarray(firings)
+        if len(firings):
+            times = firings[:, 0].astype(np.int64)
+            neurons = firings[:, 1].astype(np.intp)
+            self.t_end = max(self.t_end, int(times[-1]) + 1)
+            self.spike_counts += np.bincount(neurons, minlength=self.N)
+            self._add_population(times, neurons)
+            self._add_intervals(times, neurons)
+        if t_end is not None:
+            self.t_end = max(self.t_end, t_end)
+
+    def _add_population(self, times, neurons):
+        bins = (times - self.t_start) // self.bin_steps
+        first = int(bins[0])
+        index = 2 * (bins - first) + (neurons >= self.Ne)
+        counts = np.bincount(index, minlength=2 * (int(bins[-1]) - first + 1)).reshape(-1, 2)
+        self.population_counts = _grow(self.population_counts, first + len(counts))
+        self.population_counts[first:first + len(counts)] += counts
+
+    def _add_intervals(self, times, neurons):
+        # Within each neuron (stable sort keeps its spikes in time order) every
+        # spike pairs with the previous one, the first with the last of earlier chunks
+        order = np.argsort(neurons, kind='stable')
+        neurons = neurons[order]
+        times = times[order]
+        new_neuron = np.ones(len(neurons), dtype=bool)
+        new_neuron[1:] = neurons[1:] != neurons[:-1]
+        previous = np.empty_like(times)
+        previous[1:] = times[:-1]
+        previous[new_neuron] = self.last_spike[neurons[new_neuron]]
+        last = np.ones(len(neurons), dtype=bool)
+        last[:-1] = new_neuron[1:]
+        self.last_spike[neurons[last]] = times[last]
+
+        valid = previous >= 0
+        intervals = (times[valid] - previous[valid]) * self.dt
+        owners = neurons[valid]
+        self.isi_sum += np.bincount(owners, weights=intervals, minlength=self.N)
+        self.isi_sum_squares += np.bincount(owners, weights=intervals * intervals, minlength=self.N)
+        self.isi_n += np.bincount(owners, minlength=self.N)
+
+        n_bins = len(self.isi_edges) - 1
+        bins = np.clip(np.searchsorted(self.isi_edges, intervals, side='right') - 1, 0, n_bins - 1)
+        self.isi_counts += np.bincount(n_bins * (owners >= self.Ne) + bins, minlength=2 * n_bins).reshape(2, n_bins)
+
+    @property
+    def duration(self):
+        # Observed span in ms
+        return (self.t_end - self.t_start) * self.dt
+
+    def firing_rates(self):
+        # Per-neuron rates in Hz
+        if self.duration <= 0:
+            return np.zeros(self.N)
+        return self.spike_counts / (self.duration / 1000.0)
+
+    def population_rate(self, split=False):
+        # (bin start times in ms, mean rate per neuron in Hz); with split=True the
+        # rate is an (n_bins, 2) array of excitatory and inhibitory rates
+        n_bins = -(-(self.t_end - self.t_start) // self.bin_steps)
+        counts = self.population_counts[:n_bins]
+        t = (self.t_start + np.arange(n_bins) * self.bin_steps) * self.dt
+        sizes = np.array([self.Ne, self.N - self.Ne], dtype=np.float64)
+        if split:
+            with np.errstate(invalid='ignore', divide='ignore'):
+                return t, counts / sizes / (self.bin_ms / 1000.0)
+        return t, counts.sum(axis=1) / self.N / (self.bin_ms / 1000.0)
+
+    def mean_isi(self):
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return self.isi_sum / self.isi_n
+
+    def cv_isi(self):
+        # Coefficient of variation of each neuron's ISIs; NaN below two intervals
+        with np.errstate(invalid='ignore', divide='ignore'):
+            mean = self.isi_sum / self.isi_n
+            variance = self.isi_sum_squares / self.isi_n - mean * mean
+            cv = np.sqrt(np.maximum(variance, 0.0)) / mean
+        cv[self.isi_n < 2] = np.nan
+        return cv
+
+    def isi_histogram(self):
+        # (edges in ms, counts of the excitatory and inhibitory populations)
+        return self.isi_edges, self.isi_counts[0], self.isi_counts[1]
+
+    def rate_histogram(self, edges=None):
+        # (edges in Hz, counts of the excitatory and inhibitory per-neuron rates)
+        rates = self.firing_rates()
+        if edges is None:
+            edges = np.histogram_bin_edges(rates, bins=50)
+        return (edges, np.histogram(rates[:self.Ne], edges)[0], np.histogram(rates[self.Ne:], edges)[0])
+
+    def power_spectrum(self, segment_ms=None, split=False):
+        # Spectrum of the population rate (see power_spectrum)
+        _, rate = self.population_rate(split)
+        segment = None if segment_ms is None else max(2, int(round(segment_ms / self.bin_ms)))
+        return power_spectrum(rate, self.bin_ms, segment)
+
+
+def analyze(chunks, N, Ne=None, dt=1.0, bin_ms=1.0, **kwargs):
+    # SpikeStatistics over an iterable of firings arrays or stream() chunks
+    statistics = SpikeStatistics(N, Ne, dt, bin_ms, **kwargs)
+    for chunk in chunks:
+        if isinstance(chunk, dict):
+            statistics.add(chunk['firings'], chunk['t_end'])
+        else:
+            statistics.add(chunk)
+    return statistics
+
+
+def power_spectrum(signal, sample_ms, segment=None):
+    # Welch estimate of the power spectral density of a signal sampled every
+    # sample_ms: Hann-windowed segments of `segment` samples (default the whole
+    # signal) with 50% overlap, mean removed. Returns (frequencies in Hz, power);
+    # the power has one column per column of a 2-D signal.
+    signal = np.asarray(signal, dtype=np.float64)
+    segment = len(signal) if segment is None else min(segment, len(signal))
+    step = max(1, segment // 2)
+    windows = np.lib.stride_tricks.sliding_window_view(signal, segment, axis=0)[::step]
+    windows = windows - windows.mean(axis=-1, keepdims=True)
+    taper = np.hanning(segment)
+    fs = 1000.0 / sample_ms
+    spectra = np.abs(np.fft.rfft(windows * taper, axis=-1)) ** 2 / (fs * np.sum(taper ** 2))
+    spectra[..., 1:-1 if segment % 2 == 0 else None] *= 2   # One-sided
+    return np.fft.rfftfreq(segment, 1.0 / fs), np.moveaxis(spectra.mean(axis=0), -1, 0)
+
+
+def _halve(counts, axis):
+    # Sums neighbouring pairs of bins along axis (an odd last bin stays on its own)
+    counts = np.moveaxis(counts, axis, 0)
+    halved = counts[0::2].astype(np.int64)
+    halved[:len(counts) // 2] += counts[1::2]
+    return np.moveaxis(halved, 0, axis)
+
+
+class RasterPyramid:
+    # Spike counts binned at bin_steps x neuron_bin and, for zooming out, at every
+    # power-of-two coarsening of each axis. Level (kt, kn) bins 2**kt times as many
+    # steps and 2**kn times as many neurons; levels are built on demand from the
+    # base counts. window() picks each axis' level from its own span, so a raster
+    # of any number of spikes is shown at about one bin per pixel and zooming in
+    # time alone still sharpens the time axis.
+    def __init__(self, N, bin_steps=1, neuron_bin=1, t_start=0):
+        self.N = N
+        self.bin_steps = bin_steps
+        self.neuron_bin = neuron_bin
+        self.t_start = t_start
+        self.t_end = t_start
+        self.rows = -(-N // neuron_bin)
+        self._base = np.zeros((256, self.rows), dtype=np.int32)   # (time bins, neuron bins)
+        self._levels = {}
+
+    def add(self, firings, t_end=None):
+        firings = np.asarray(firings)
+        if len(firings):
+            bins = (firings[:, 0].astype(np.int64) - self.t_start) // self.bin_steps
+            rows = firings[:, 1].astype(np.int64) // self.neuron_bin
+            # Unlike SpikeStatistics, the pyramid does not need the spikes in time order
+            first = int(bins.min())
+            counts = np.bincount((bins - first) * self.rows + rows, minlength=(int(bins.max()) - first + 1) * self.rows)
+            counts = counts.reshape(-1, self.rows)
+            self._base = _grow(self._base, first + len(counts))
+            self._base[first:first + len(counts)] += counts.astype(np.int32)
+            self.t_end = max(self.t_end, int(firings[:, 0].max()) + 1)
+            self._levels = {}
+        if t_end is not None:
+            self.t_end = max(self.t_end, t_end)
+
+    @property
+    def n_bins(self):
+        return -(-(self.t_end - self.t_start) // self.bin_steps)
+
+    def level(self, kt, kn=None):
+        # (time bins, neuron bins) counts of level (kt, kn); kn defaults to kt
+        if kn is None:
+            kn = kt
+        if not self._levels:
+            self._levels[0, 0] = self._base[:self.n_bins]
+        if (kt, kn) not in self._levels:
+            if kn > 0:
+                self._levels[kt, kn] = _halve(self.level(kt, kn - 1), axis=1)
+            else:
+                self._levels[kt, kn] = _halve(self.level(kt - 1, kn), axis=0)
+        return self._levels[kt, kn]
+
+    @staticmethod
+    def _coarsening(span, size, limit):
+        # Smallest k with span / 2**k <= limit, stopping once one bin covers the axis
+        k = 0
+        while span / 2 ** k > limit and size > 2 ** k:
+            k += 1
+        return k
+
+    def window(self, t0, t1, n0, n1, max_width, max_height):
+        # Counts covering steps t0..t1 and neurons n0..n1, as a (neuron bins, time
+        # bins) image no larger than max_width x max_height where possible, and
+        # its (t_left, t_right, n_bottom, n_top) extent snapped to the bins
+        t0 = max(t0, self.t_start)
+        t1 = max(min(t1, self.t_start + self.n_bins * self.bin_steps), t0)
+        n0, n1 = max(n0, 0), max(min(n1, self.N), max(n0, 0))
+        kt = self._coarsening((t1 - t0) / self.bin_steps, self.n_bins, max_width)
+        kn = self._coarsening((n1 - n0) / self.neuron_bin, self.rows, max_height)
+        counts = self.level(kt, kn)
+        t_scale = self.bin_steps * 2 ** kt
+        n_scale = self.neuron_bin * 2 ** kn
+        first = int((t0 - self.t_start) // t_scale)
+        last = max(first + 1, int(-(-(t1 - self.t_start) // t_scale)))
+        bottom = int(n0 // n_scale)
+        top = max(bottom + 1, int(-(-n1 // n_scale)))
+        image = counts[first:last, bottom:top].T
+        extent = (self.t_start + first * t_scale, self.t_start + last * t_scale, bottom * n_scale, top * n_scale)
+        return image, extent
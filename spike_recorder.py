@@ -0,0 +1,160 @@
+import numpy as np
+
+
+class SpikeRecorder:
+    # Array-backed replacement for a Python list of [t, neuron] pairs. Spikes are
+    # written into preallocated int32 (chunk_size, 2) chunks; with a capacity the
+    # recorder becomes a ring buffer that keeps only the most recent spikes.
+    def __init__(self, N, chunk_size=65536, capacity=None, dt=1.0):
+        self.N = N
+        self.chunk_size = chunk_size
+        self.capacity = capacity
+        self.dt = dt
+        self.clear()
+
+    def clear(self):
+        if self.capacity is None:
+            self._chunks = [np.empty((self.chunk_size, 2), dtype=np.int32)]
+        else:
+            self._chunks = [np.empty((self.capacity, 2), dtype=np.int32)]
+        self._fill = 0       # Rows used in the last chunk (write position in ring mode)
+        self._count = 0      # Spikes currently held
+        self.total_spikes = 0
+        self.t_start = None
+        self.t_end = 0
+        self._neuron_index = None
+
+    def __len__(self):
+        return self._count
+
+    def record(self, t, fired):
+        if self.t_start is None:
+            self.t_start = t
+        self.t_end = t + 1
+        n = len(fired)
+        if n == 0:
+            return
+        self._neuron_index = None
+        self.total_spikes += n
+        if self.capacity is None:
+            self._append(t, fired)
+        else:
+            self._append_ring(t, fired)
+
+    def _append(self, t, fired):
+        start = 0
+        n = len(fired)
+        while start < n:
+            chunk = self._chunks[-1]
+            if self._fill == len(chunk):
+                chunk = np.empty((self.chunk_size, 2), dtype=np.int32)
+                self._chunks.append(chunk)
+                self._fill = 0
+            m = min(n - start, len(chunk) - self._fill)
+            chunk[self._fill:self._fill + m, 0] = t
+            chunk[self._fill:self._fill + m, 1] = fired[start:start + m]
+            self._fill += m
+            start += m
+        self._count += n
+
+    def _append_ring(self, t, fired):
+        buffer = self._chunks[0]
+        if len(fired) > self.capacity:
+            fired = fired[-self.capacity:]
+        n = len(fired)
+        positions = (self._fill + np.arange(n)) % self.capacity
+        buffer[positions, 0] = t
+        buffer[positions, 1] = fired
+        self._fill = (self._fill + n) % self.capacity
+        self._count = min(self._count + n, self.capacity)
+
+    def chunks(self):
+        # Zero-copy (k, 2) views of the recorded spikes in time order
+        if self.capacity is not None:
+            buffer = self._chunks[0]
+            if self._count < self.capacity:
+                yield buffer[:self._count]
+            else:
+                yield buffer[self._fill:]
+                yield buffer[:self._fill]
+            return
+        for chunk in self._chunks[:-1]:
+            yield chunk
+        yield self._chunks[-1][:self._fill]
+
+    def _consolidate(self):
+        # Merge the chunks into a single growable array so later reads are views
+        if len(self._chunks) == 1:
+            return
+        n_chunks = -(-self._count // self.chunk_size) + 1
+        merged = np.empty((n_chunks * self.chunk_size, 2), dtype=np.int32)
+        merged[:self._count] = np.concatenate(list(self.chunks()))
+        self._chunks = [merged]
+        self._fill = self._count
+
+    @property
+    def firings(self):
+        # (n_spikes, 2) array of [time step, neuron index]; a view whenever possible
+        if self.capacity is not None:
+            parts = list(self.chunks())
+            if len(parts) == 1:
+                return parts[0]
+            return np.concatenate(parts)
+        self._consolidate()
+        return self._chunks[0][:self._fill]
+
+    @property
+    def times(self):
+        return self.firings[:, 0]
+
+    @property
+    def neurons(self):
+        return self.firings[:, 1]
+
+    def _index(self):
+        if self._neuron_index is None:
+            neurons = self.neurons
+            order = np.argsort(neurons, kind='stable')
+            indptr = np.concatenate(([0], np.cumsum(np.bincount(neurons, minlength=self.N))))
+            self._neuron_index = (order, indptr)
+        return self._neuron_index
+
+    def spike_times(self, neuron):
+        # Time steps at which one neuron fired, in increasing order
+        order, indptr = self._index()
+        return self.times[order[indptr[neuron]:indptr[neuron + 1]]]
+
+    def spike_counts(self):
+        return np.bincount(self.neurons, minlength=self.N)
+
+    def duration(self):
+        # Recorded span in ms; in ring mode this is the span still held in the buffer
+        if self.t_start is None:
+            return 0.0
+        t_start = self.t_start
+        if self.capacity is not None and self.total_spikes > self._count:
+            t_start = int(self.times[0])
+        return (self.t_end - t_start) * self.dt
+
+    def firing_rates(self, duration=None):
+        # Per-neuron rates in Hz
+        if duration is None:
+            duration = self.duration()
+        if duration <= 0:
+            return np.zeros(self.N)
+        return self.spike_counts() / (duration / 1000.0)
+
+    def isi(self, neuron):
+        # Inter-spike intervals of one neuron in ms
+        return np.diff(self.spike_times(neuron)) * self.dt
+
+    def all_isi(self):
+        # Inter-spike intervals of every neuron concatenated, in ms
+        order, indptr = self._index()
+        times = self.times[order]
+        intervals = np.diff(times)
+        same_neuron = np.ones(len(intervals), dtype=bool)
+        boundaries = indptr[1:-1]
+        boundaries = boundaries[(boundaries > 0) & (boundaries < len(times))]
+        same_neuron[boundaries - 1] = False
+        return intervals[same_neuron] * self.dt
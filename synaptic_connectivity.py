@@ -0,0 +1,269 @@
+import numpy as np
+
+# Connectivity backends share the same orientation as the dense synaptic_weights
+# matrix: S[post, pre] is the weight from neuron `pre` onto neuron `post`.
+
+
+def segment_positions(indptr, rows):
+    # Concatenated positions indptr[row]..indptr[row + 1] - 1 of every row, without a Python loop
+    starts = indptr[rows]
+    counts = indptr[np.asarray(rows) + 1] - starts
+    total = counts.sum()
+    if total == 0:
+        return np.empty(0, dtype=np.int64)
+    return np.repeat(starts - np.cumsum(counts) + counts, counts) + np.arange(total)
+
+
+class DenseConnectivity:
+    def __init__(self, weights):
+        self.weights = weights
+        self.N = weights.shape[0]
+
+    def propagate(self, fired):
+        return np.sum(self.weights[:, fired], axis=1)
+
+    def propagate_batch(self, fired):
+        # fired is a (trials, N) boolean mask; returns the (trials, N) synaptic input
+        return fired.astype(self.weights.dtype) @ self.weights.T
+
+    def restrict_targets(self, lo, hi):
+        # Synapses onto neurons lo..hi-1 only, indexed locally from lo
+        return DenseConnectivity(self.weights[lo:hi])
+
+    def outgoing(self, pre):
+        column = self.weights[:, pre]
+        targets = np.nonzero(column)[0]
+        return targets, column[targets]
+
+    def to_dense(self):
+        return self.weights
+
+
+class SparseConnectivity:
+    # Compressed rows keyed by presynaptic neuron (the CSC layout of S), so the
+    # outgoing synapses of neuron `pre` are targets/weights[indptr[pre]:indptr[pre + 1]]
+    def __init__(self, N, indptr, targets, weights):
+        self.N = N
+        self.indptr = np.asarray(indptr, dtype=np.int64)
+        self.targets = np.asarray(targets, dtype=np.int32)
+        self.weights = np.asarray(weights)
+        self._incoming = None
+
+    @classmethod
+    def from_dense(cls, weights):
+        N = weights.shape[0]
+        pre, post = np.nonzero(weights.T)
+        counts = np.bincount(pre, minlength=weights.shape[1])
+        indptr = np.concatenate(([0], np.cumsum(counts)))
+        return cls(N, indptr, post, weights[post, pre])
+
+    @classmethod
+    def from_scipy(cls, matrix):
+        matrix = matrix.tocsc()
+        matrix.sort_indices()
+        return cls(matrix.shape[0], matrix.indptr, matrix.indices, matrix.data)
+
+    @classmethod
+    def random(cls, Ne, Ni, connection_probability, rng, dtype=np.float32):
+        # Same weight distribution as the dense default (0.5 * U for excitatory,
+        # -U for inhibitory) without ever allocating an N x N matrix
+        N = Ne + Ni
+        counts = rng.binomial(N - 1, connection_probability, size=N)
+        indptr = np.concatenate(([0], np.cumsum(counts)))
+        targets = np.empty(indptr[-1], dtype=np.int32)
+
+        for pre in range(N):
+            post = rng.choice(N - 1, size=counts[pre], replace=False)
+            post.sort()
+            post[post >= pre] += 1  # Skip the self-connection
+            targets[indptr[pre]:indptr[pre + 1]] = post
+
+        weights = rng.random(indptr[-1], dtype=dtype)
+        weights[:indptr[Ne]] *= 0.5
+        weights[indptr[Ne]:] *= -1
+        return cls(N, indptr, targets, weights)
+
+    def synapse_indices(self, fired):
+        # Positions of every outgoing synapse of the fired neurons
+        return segment_positions(self.indptr, fired)
+
+    def incoming_synapses(self, post):
+        # (synapse positions, presynaptic neurons) of every synapse onto the `post`
+        # neurons, from a by-target index built on first use. The index assumes
+        # the synapse structure no longer changes; weights may.
+        if self._incoming is None:
+            order = np.argsort(self.targets, kind='stable')
+            incoming_indptr = np.concatenate(([0], np.cumsum(np.bincount(self.targets, minlength=self.N))))
+            sources = np.repeat(np.arange(len(self.indptr) - 1, dtype=np.int32), np.diff(self.indptr))
+            self._incoming = (incoming_indptr, order, sources[order])
+        incoming_indptr, order, sources = self._incoming
+        positions = segment_positions(incoming_indptr, post)
+        return order[positions], sources[positions]
+
+    def propagate(self, fired):
+        if len(fired) == 0:
+            return np.zeros(self.N)
+        synapses = self.synapse_indices(fired)
+        return np.bincount(self.targets[synapses], weights=self.weights[synapses], minlength=self.N)
+
+    def propagate_batch(self, fired):
+        # fired is a (trials, N) boolean mask; returns the (trials, N) synaptic input
+        n_trials = fired.shape[0]
+        trials, neurons = np.nonzero(fired)
+        synapses = self.synapse_indices(neurons)
+        synapse_trials = np.repeat(trials, self.indptr[neurons + 1] - self.indptr[neurons])
+        flat_targets = synapse_trials * self.N + self.targets[synapses]
+        return np.bincount(flat_targets, weights=self.weights[synapses],
+                           minlength=n_trials * self.N).reshape(n_trials, self.N)
+
+    def restrict_targets(self, lo, hi):
+        # Synapses onto neurons lo..hi-1 only, indexed locally from lo
+        n_pre = len(self.indptr) - 1
+        pre = np.repeat(np.arange(n_pre), np.diff(self.indptr))
+        keep = (self.targets >= lo) & (self.targets < hi)
+        indptr = np.concatenate(([0], np.cumsum(np.bincount(pre[keep], minlength=n_pre))))
+        return SparseConnectivity(hi - lo, indptr, self.targets[keep] - lo, self.weights[keep])
+
+    def outgoing(self, pre):
+        start, end = self.indptr[pre], self.indptr[pre + 1]
+        return self.targets[start:end], self.weights[start:end]
+
+    def to_dense(self):
+        S = np.zeros((self.N, len(self.indptr) - 1), dtype=self.weights.dtype)
+        pre = np.repeat(np.arange(len(self.indptr) - 1), np.diff(self.indptr))
+        S[self.targets, pre] = self.weights
+        return S
+
+    @property
+    def nnz(self):
+        return len(self.targets)
+
+
+class DelayedConnectivity:
+    # Wraps a Dense or SparseConnectivity with integer conduction delays, in steps.
+    # A spike propagated in step t reaches its targets in step t + delay, so a
+    # delay of 0 is the undelayed behaviour. delays may be
+    #   a scalar                       the same delay for every synapse
+    #   one value per presynaptic      (N,) per-group delays
+    #   one value per synapse          (nnz,) aligned with SparseConnectivity.targets,
+    #                                  or (N, N) aligned with dense weights
+    # Pending input sits in a ring buffer with one row per delay slot: spikes
+    # are scattered into the rows of their arrival steps, and each step reads
+    # and clears the row of the current step, so delivery costs
+    # O(spikes x fan-out) plus one row.
+    def __init__(self, connectivity, delays):
+        self.connectivity = connectivity
+        self.N = connectivity.N
+        self.delays = np.asarray(delays)
+        if self.delays.size and self.delays.min() < 0:
+            raise ValueError("Delays must be non-negative")
+        self.max_delay = int(self.delays.max()) if self.delays.size else 0
+        self.n_slots = self.max_delay + 1
+
+        sparse = isinstance(connectivity, SparseConnectivity)
+        if self.delays.ndim == 0:
+            self.kind = 'uniform'
+        elif (sparse and self.delays.shape == (connectivity.nnz,)) or (not sparse and self.delays.ndim == 2):
+            self.kind = 'synapse'
+        elif self.delays.shape == (len(connectivity.indptr) - 1 if sparse else connectivity.weights.shape[1],):
+            self.kind = 'presynaptic'
+        else:
+            raise ValueError(f"Delays of shape {self.delays.shape} do not match the connectivity")
+        self.reset()
+
+    @property
+    def weights(self):
+        return self.connectivity.weights
+
+    def reset(self):
+        # Drops all input still in flight
+        self.pending = np.zeros((self.n_slots, self.N))
+        self.head = 0
+
+    def get_state(self):
+        return {'pending': self.pending.copy(), 'head': np.array(self.head)}
+
+    def set_state(self, state):
+        self.pending = np.array(state['pending'], dtype=np.float64)
+        self.head = int(state['head'])
+
+    def _slots(self, delays):
+        return (delays.astype(np.intp) + self.head) % self.n_slots
+
+    def schedule(self, fired):
+        fired = np.asarray(fired, dtype=np.intp)
+        if len(fired) == 0:
+            return
+        connectivity = self.connectivity
+        if self.kind == 'uniform':
+            self.pending[(self.head + self.max_delay) % self.n_slots] += connectivity.propagate(fired)
+        elif self.kind == 'presynaptic':
+            fired_delays = self.delays[fired]
+            for delay in np.unique(fired_delays):
+                self.pending[(self.head + int(delay)) % self.n_slots] += \
+                    connectivity.propagate(fired[fired_delays == delay])
+        elif isinstance(connectivity, SparseConnectivity):
+            synapses = connectivity.synapse_indices(fired)
+            slots = self._slots(self.delays[synapses])
+            np.add.at(self.pending.reshape(-1), slots * self.N + connectivity.targets[synapses],
+                      connectivity.weights[synapses])
+        else:
+            slots = self._slots(self.delays[:, fired])
+            np.add.at(self.pending.reshape(-1), (slots * self.N + np.arange(self.N)[:, np.newaxis]).ravel(),
+                      connectivity.weights[:, fired].ravel())
+
+    def propagate(self, fired):
+        # Schedules the spikes of this step and returns the input arriving now
+        self.schedule(fired)
+        arriving = self.pending[self.head].copy()
+        self.pending[self.head] = 0
+        self.head = (self.head + 1) % self.n_slots
+        return arriving
+
+    def restrict_targets(self, lo, hi):
+        # Synapses onto neurons lo..hi-1 with their delays and an empty buffer of their own
+        delays = self.delays
+        if self.kind == 'synapse':
+            if isinstance(self.connectivity, SparseConnectivity):
+                targets = self.connectivity.targets
+                delays = delays[(targets >= lo) & (targets < hi)]
+            else:
+                delays = delays[lo:hi]
+        return DelayedConnectivity(self.connectivity.restrict_targets(lo, hi), delays)
+
+    def outgoing(self, pre):
+        return self.connectivity.outgoing(pre)
+
+    def to_dense(self):
+        return self.connectivity.to_dense()
+
+
+def random_delays(connectivity, Ne, max_delay=20, rng=None, dtype=None, dt=1.0):
+    # Per-synapse delays as in Izhikevich's polychronization networks: excitatory
+    # synapses uniform on 1..max_delay ms, inhibitory ones 1 ms, returned in steps
+    # of dt as the smallest unsigned integer type that holds them unless dtype is given
+    if max_delay < 1:
+        raise ValueError(f"max_delay must be at least 1 ms, got {max_delay}")
+    max_steps = max(1, int(round(max_delay / dt)))
+    if dtype is None:
+        dtype = np.min_scalar_type(max_steps)
+    elif max_steps > np.iinfo(dtype).max:
+        raise ValueError(f"Delays of up to {max_steps} steps do not fit {np.dtype(dtype).name}")
+    rng = np.random.default_rng(rng)
+    if isinstance(connectivity, SparseConnectivity):
+        n_excitatory = connectivity.indptr[Ne]
+        delays = np.ones(connectivity.nnz)
+        delays[:n_excitatory] = rng.integers(1, max_delay + 1, n_excitatory)
+    else:
+        weights = connectivity.weights if isinstance(connectivity, DenseConnectivity) else np.asarray(connectivity)
+        delays = np.ones(weights.shape)
+        delays[:, :Ne] = rng.integers(1, max_delay + 1, (weights.shape[0], Ne))
+    return np.maximum(np.round(delays / dt), 1).astype(dtype)
+
+
+def as_connectivity(weights):
+    if isinstance(weights, (DenseConnectivity, SparseConnectivity, DelayedConnectivity)):
+        return weights
+    if hasattr(weights, 'tocsc'):  # scipy.sparse matrix or array
+        return SparseConnectivity.from_scipy(weights)
+    return DenseConnectivity(np.asarray(weights))
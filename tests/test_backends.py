@@ -0,0 +1,22 @@
+import numpy as np
+import pytest
+from izhikevich_batch import integrate_batch, parameter_grid
+from izhikevich_simulation import IzhikevichNetwork
+
+pytest.importorskip('numba')
+
+
+def test_network_rasters_are_identical():
+    rasters = [IzhikevichNetwork(800, 200, seed=0, backend=name).run(1000) for name in ('numpy', 'numba')]
+    assert len(rasters[0]) > 0
+    assert np.array_equal(rasters[0], rasters[1])
+
+
+def test_integrate_batch_is_identical():
+    grid = parameter_grid(I=np.linspace(0, 20, 11), a=[0.02, 0.1])
+    results = [integrate_batch(grid['I'], grid['a'], 0.2, -65, 8, duration=200, n_steps=2000,
+                               noise_std=2.0, seed=3, backend=name) for name in ('numpy', 'numba')]
+    (_, v_numpy, counts_numpy), (_, v_numba, counts_numba) = results
+    assert counts_numpy.sum() > 0
+    assert np.array_equal(counts_numpy, counts_numba)
+    assert np.array_equal(v_numpy, v_numba)
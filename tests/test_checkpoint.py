@@ -0,0 +1,46 @@
+import numpy as np
+import pytest
+from input_drives import OUInput, PoissonInput
+from izhikevich_simulation import IzhikevichNetwork
+from parallel_simulation import ParallelIzhikevichNetwork
+from plasticity import STDP
+from simulation_checkpoint import restore_checkpoint, save_checkpoint
+
+NE, NI = 160, 40
+DURATION = 300
+CHECKPOINT = 137  # Not a multiple of the input block length
+
+
+def drives():
+    return OUInput(NE + NI, mean=3.0, sigma=2.0) + PoissonInput(NE + NI, rate_hz=20, weight=5.0, n_inputs=10)
+
+
+NETWORKS = {
+    'thalamic': lambda: IzhikevichNetwork(NE, NI, seed=1),
+    'ou+poisson': lambda: IzhikevichNetwork(NE, NI, seed=1, input_generator=drives()),
+    'delays+stdp': lambda: IzhikevichNetwork(NE, NI, seed=1, connection_probability=0.1, delays='random',
+                                             plasticity=STDP()),
+    'parallel': lambda: ParallelIzhikevichNetwork(NE, NI, seed=1, n_workers=2),
+    'parallel+delays': lambda: ParallelIzhikevichNetwork(NE, NI, seed=1, n_workers=2, connection_probability=0.1,
+                                                         delays='random'),
+}
+
+
+@pytest.mark.parametrize('name', sorted(NETWORKS))
+def test_restored_run_is_identical(name, tmp_path):
+    make = NETWORKS[name]
+    networks = [make() for _ in range(3)]
+    try:
+        uninterrupted, first, restored = networks
+        expected = uninterrupted.run(DURATION)
+        head = first.run(CHECKPOINT)
+        path = save_checkpoint(str(tmp_path / 'checkpoint.npz'), first)
+        restored.run(50)  # State that the checkpoint has to replace completely
+        restore_checkpoint(restored, path)
+        tail = restored.run(DURATION - CHECKPOINT)
+    finally:
+        for network in networks:
+            if hasattr(network, 'close'):
+                network.close()
+    assert len(expected) > 0
+    assert np.array_equal(np.concatenate([head, tail]), expected)
@@ -0,0 +1,33 @@
+import numpy as np
+import pytest
+from izhikevich_simulation import IzhikevichNetwork, default_neuron_params
+from synaptic_connectivity import SparseConnectivity
+
+NE, NI = 400, 100
+
+
+def model(seed):
+    rng = np.random.default_rng(seed)
+    params = default_neuron_params(NE, NI, rng)
+    weights = 2 * SparseConnectivity.random(NE, NI, 0.1, rng, dtype=np.float64).to_dense()
+    # Weights on a 1/64 grid sum exactly in any order, so dense and sparse input match bit for bit
+    weights = np.round(64 * weights) / 64
+    return params, weights, rng
+
+
+@pytest.mark.parametrize('seed', [0, 1, 2])
+@pytest.mark.parametrize('delays', [None, 'presynaptic', 'synapse'])
+def test_sparse_raster_matches_dense(seed, delays):
+    params, weights, rng = model(seed)
+    sparse = SparseConnectivity.from_dense(weights)
+    dense_delays = sparse_delays = None
+    if delays == 'presynaptic':
+        dense_delays = sparse_delays = rng.integers(1, 11, NE + NI)
+    elif delays == 'synapse':
+        dense_delays = rng.integers(1, 11, weights.shape)
+        pre, post = np.nonzero(weights.T)
+        sparse_delays = dense_delays[post, pre]
+    dense_run = IzhikevichNetwork(NE, NI, weights, *params, seed=seed, delays=dense_delays).run(500)
+    sparse_run = IzhikevichNetwork(NE, NI, sparse, *params, seed=seed, delays=sparse_delays).run(500)
+    assert len(dense_run) > 0
+    assert np.array_equal(dense_run, sparse_run)
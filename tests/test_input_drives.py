@@ -0,0 +1,22 @@
+import numpy as np
+import pytest
+from input_drives import OUInput, PoissonInput
+from izhikevich_simulation import IzhikevichNetwork, thalamic_input
+
+NE, NI = 160, 40
+
+DRIVES = {
+    'thalamic': lambda block_steps: thalamic_input(NE, NI, block_steps=block_steps),
+    'ou': lambda block_steps: OUInput(NE + NI, mean=3.0, sigma=3.0, block_steps=block_steps),
+    'poisson': lambda block_steps: PoissonInput(NE + NI, rate_hz=20, weight=5.0, n_inputs=10,
+                                                block_steps=block_steps),
+}
+
+
+@pytest.mark.parametrize('name', sorted(DRIVES))
+def test_raster_does_not_depend_on_block_steps(name):
+    rasters = [IzhikevichNetwork(NE, NI, seed=3, input_generator=DRIVES[name](block_steps)).run(300)
+               for block_steps in (1, 100, 37)]
+    assert len(rasters[0]) > 0
+    assert np.array_equal(rasters[0], rasters[1])
+    assert np.array_equal(rasters[0], rasters[2])
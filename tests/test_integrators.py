@@ -0,0 +1,39 @@
+import numpy as np
+import pytest
+from izhikevich_integrators import integrate_neuron
+
+PARAMS = {'I': 10, 'a': 0.02, 'b': 0.2, 'c': -65, 'd': 8}
+DURATION = 500
+
+
+@pytest.fixture(scope='module')
+def reference():
+    _, _, spikes = integrate_neuron(**PARAMS, duration=DURATION, dt=0.001, method='rk4')
+    return spikes
+
+
+def spike_error(dt, method, reference):
+    _, _, spikes = integrate_neuron(**PARAMS, duration=DURATION, dt=dt, method=method)
+    assert len(spikes) == len(reference)
+    return np.max(np.abs(spikes - reference))
+
+
+def test_exact_qif_converges_at_second_order(reference):
+    errors = [spike_error(dt, 'exact_qif', reference) for dt in (0.1, 0.05, 0.025)]
+    assert errors[0] < 0.1
+    # Halving dt cuts the error about fourfold; first order would only halve it
+    assert errors[0] / errors[1] > 3
+    assert errors[1] / errors[2] > 3
+
+
+def test_rk4_matches_reference(reference):
+    assert spike_error(0.05, 'rk4', reference) < 1e-3
+
+
+@pytest.mark.parametrize('v0', [30, 100])
+def test_exact_qif_fires_at_once_above_peak(v0):
+    _, _, spikes = integrate_neuron(**PARAMS, v0=v0, duration=200, dt=0.1, method='exact_qif')
+    _, _, expected = integrate_neuron(**PARAMS, v0=v0, duration=200, dt=0.01, method='rk4')
+    assert spikes[0] == 0.0
+    assert len(spikes) == len(expected)
+    assert np.max(np.abs(spikes - expected)) < 0.1
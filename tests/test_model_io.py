@@ -0,0 +1,32 @@
+import numpy as np
+import pytest
+from izhikevich_simulation import IzhikevichNetwork, main
+from model_io import load_model, save_model
+from synaptic_connectivity import SparseConnectivity
+
+
+@pytest.mark.parametrize('file_name', ['model.npz', 'model'])
+@pytest.mark.parametrize('sparse', [False, True])
+def test_model_round_trip(tmp_path, file_name, sparse):
+    network = IzhikevichNetwork(160, 40, seed=2, connection_probability=0.2 if sparse else None, delays='random')
+    path = str(tmp_path / file_name)
+    save_model(path, network.connectivity, network.a, network.b, network.c, network.d, Ne=160, Ni=40, seed=2)
+    model = load_model(path)
+    assert (model['Ne'], model['Ni'], model['seed']) == (160, 40, 2)
+    assert isinstance(model['synaptic_weights'], SparseConnectivity) == sparse
+    assert np.array_equal(np.asarray(model['delays']), network.delays)
+    for name in ('a', 'b', 'c', 'd'):
+        assert np.array_equal(model[name], getattr(network, name))
+    loaded = IzhikevichNetwork(160, 40, model['synaptic_weights'], model['a'], model['b'], model['c'], model['d'],
+                               seed=2, delays=model['delays'])
+    assert np.array_equal(loaded.connectivity.to_dense(), network.connectivity.to_dense())
+
+
+@pytest.mark.parametrize('file_name', ['model.npz', 'model'])
+def test_loaded_model_replays_the_saved_run(tmp_path, file_name, capsys):
+    model, first, second = (str(tmp_path / name) for name in (file_name, 'first.npy', 'second.npy'))
+    main(['--ne', '160', '--ni', '40', '--duration', '300', '--seed', '4', '--connection-probability', '0.2',
+          '--max-delay', '5', '--output', first, '--save-model', model])
+    main(['--model', model, '--duration', '300', '--output', second])
+    assert len(np.load(first)) > 0
+    assert np.array_equal(np.load(first), np.load(second))
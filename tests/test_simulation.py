@@ -0,0 +1,27 @@
+import numpy as np
+from izhikevich_simulation import IzhikevichNetwork
+
+
+def mean_rate(dt, **kwargs):
+    network = IzhikevichNetwork(seed=1, dt=dt, **kwargs)
+    duration = 500
+    return len(network.run(duration)) / network.N / (duration / 1000.0)
+
+
+def test_rates_converge_as_dt_shrinks():
+    rates = [mean_rate(dt) for dt in (0.25, 0.1)]
+    assert rates[0] > 5
+    assert abs(rates[0] - rates[1]) < 0.1 * rates[1]
+
+
+def test_delays_are_drawn_in_ms():
+    network = IzhikevichNetwork(seed=1, dt=0.5, connection_probability=0.1, delays='random', max_delay=10)
+    delays = network.connectivity.delays
+    assert delays.min() == 2 and delays.max() == 20
+    assert np.isfinite(mean_rate(0.5, connection_probability=0.1, delays='random'))
+
+
+def test_long_delays_do_not_wrap():
+    network = IzhikevichNetwork(seed=1, connection_probability=0.1, delays='random', max_delay=300)
+    delays = network.connectivity.delays
+    assert delays.min() >= 1 and delays.max() > 255
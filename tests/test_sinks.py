@@ -0,0 +1,34 @@
+import numpy as np
+import pytest
+from izhikevich_simulation import IzhikevichNetwork, thalamic_input
+from simulation_sinks import NpyAppendSink, stream_to_sinks
+
+
+class FailingInput:
+    # Thalamic input that raises after `steps` steps
+    def __init__(self, steps):
+        self.drive = thalamic_input(160, 40)
+        self.steps = steps
+
+    def __call__(self, t, rng):
+        if t >= self.steps:
+            raise RuntimeError("input failed")
+        return self.drive(t, rng)
+
+
+def test_npy_sink_matches_run(tmp_path):
+    path = str(tmp_path / 'firings.npy')
+    spikes = stream_to_sinks(IzhikevichNetwork(160, 40, seed=5), 300, [NpyAppendSink(path)], chunk_ms=70)
+    expected = IzhikevichNetwork(160, 40, seed=5).run(300)
+    assert spikes == len(expected)
+    assert np.array_equal(np.load(path), expected)
+
+
+def test_sinks_are_closed_when_the_run_fails(tmp_path):
+    path = str(tmp_path / 'firings.npy')
+    network = IzhikevichNetwork(160, 40, seed=5, input_generator=FailingInput(250))
+    with pytest.raises(RuntimeError):
+        stream_to_sinks(network, 300, [NpyAppendSink(path)], chunk_ms=100)
+    expected = IzhikevichNetwork(160, 40, seed=5).run(200)
+    assert len(expected) > 0
+    assert np.array_equal(np.load(path), expected)
@@ -0,0 +1,29 @@
+import numpy as np
+from spike_analysis import RasterPyramid
+
+
+def make_firings(n=200000, duration=10000, N=1000):
+    rng = np.random.default_rng(0)
+    return np.column_stack((rng.integers(0, duration, n), rng.integers(0, N, n))).astype(np.int32)
+
+
+def test_window_matches_histogram():
+    firings = make_firings()
+    pyramid = RasterPyramid(1000, bin_steps=3)
+    pyramid.add(firings)
+    for view in [(0, 10000, 0, 1000, 400, 300), (1234, 1789, 333, 999, 400, 300), (5, 9000, 0, 1000, 37, 500)]:
+        image, (t0, t1, n0, n1) = pyramid.window(*view)
+        t_scale, n_scale = (t1 - t0) // image.shape[1], (n1 - n0) // image.shape[0]
+        inside = firings[(firings[:, 0] < t1) & (firings[:, 1] < n1)]
+        expected, _, _ = np.histogram2d(inside[:, 1], inside[:, 0], bins=[np.arange(n0, n1 + 1, n_scale),
+                                                                          np.arange(t0, t1 + 1, t_scale)])
+        assert np.array_equal(image, expected)
+
+
+def test_zooming_in_time_sharpens_time_axis_only():
+    pyramid = RasterPyramid(1000)
+    pyramid.add(make_firings())
+    full, full_extent = pyramid.window(0, 10000, 0, 1000, 400, 300)
+    zoomed, zoomed_extent = pyramid.window(0, 100, 0, 1000, 400, 300)
+    assert zoomed.shape[1] == 100 and zoomed_extent[1] == 100
+    assert zoomed.shape[0] == full.shape[0]